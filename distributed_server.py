@@ -5,26 +5,138 @@ Central server that receives R1 prompts, processes them with LLM,
 and distributes tasks to registered worker nodes.
 """
 
+# eventlet has to patch the stdlib before threading, queue, sockets, requests,
+# Flask, redis or the Groq client are imported, so this runs ahead of every import.
+# Sockets, threads and time then become cooperative, so blocking calls such as
+# requests.post or the Groq client yield to other connections.
+_EVENTLET_PATCHED = False
+if __name__ == "__main__":
+    try:
+        import eventlet
+        eventlet.monkey_patch()
+        _EVENTLET_PATCHED = True
+    except ImportError:
+        pass
+
 import os
 import json
 import logging
 import secrets
+import random
 import hashlib
-import asyncio
-import threading
+import hmac
+import gzip
 import queue
+import threading
+import time
+from collections import OrderedDict, defaultdict
 from datetime import datetime, timezone
-from typing import Dict, List, Optional, Any
-from flask import Flask, request, jsonify, render_template_string, session, redirect, url_for
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Set
+from flask import Flask, Response, request, session, redirect, url_for
 from flask_socketio import SocketIO, emit, join_room, leave_room
-from functools import wraps
+from functools import wraps, lru_cache
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
 
 from utils import config, llm_parse, get_env
 
+try:
+    from argon2 import PasswordHasher
+    from argon2.exceptions import VerificationError, InvalidHashError
+    _password_hasher = PasswordHasher()
+except ImportError:  # Optional: falls back to SHA-256 hashes
+    _password_hasher = None
+
+try:
+    import hyperscan
+except ImportError:  # Optional: falls back to Python substring checks
+    hyperscan = None
+
+try:
+    import redis
+except ImportError:  # Optional: only needed for multi-replica deployments
+    redis = None
+
+# Redis keys for the shared worker registry
+REDIS_WORKERS_KEY = 'lam:workers'
+REDIS_HEARTBEAT_KEY = 'lam:worker:{}:hb'
+
+
+# Substring keyword -> worker type, checked in priority order (browser first)
+ROUTING_KEYWORDS = (
+    ('browser', 'browser'), ('google', 'browser'), ('youtube', 'browser'),
+    ('site', 'browser'), ('amazon', 'browser'),
+    ('computer', 'computer'), ('volume', 'computer'), ('media', 'computer'),
+    ('run', 'computer'), ('power', 'computer'),
+    ('discord', 'messaging'), ('telegram', 'messaging'), ('messenger', 'messaging'),
+)
+# Actions that must match exactly rather than by substring
+EXACT_ROUTES = {'ai': 'ai', 'openinterpreter': 'ai'}
+
+
+def _compile_routing_database():
+    """Compile ROUTING_KEYWORDS into one Hyperscan database, matched in a single pass"""
+    if hyperscan is None:
+        return None
+    try:
+        db = hyperscan.Database()
+        db.compile(
+            expressions=[keyword.encode() for keyword, _ in ROUTING_KEYWORDS],
+            ids=list(range(len(ROUTING_KEYWORDS))),
+            flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH] * len(ROUTING_KEYWORDS)
+        )
+        return db
+    except Exception as e:
+        logging.warning(f"Hyperscan unavailable, using substring routing: {e}")
+        return None
+
+
+_ROUTING_DB = _compile_routing_database()
+
+
+def ojsonify(obj, status: int = 200) -> Response:
+    """jsonify() replacement that serializes with orjson"""
+    return Response(orjson.dumps(obj, option=orjson.OPT_NAIVE_UTC), status=status,
+                    mimetype='application/json')
+
+
+def request_json() -> Optional[Any]:
+    """Parse the request body with orjson, returning None if it is empty or invalid"""
+    body = request.get_data(cache=False)
+    if not body:
+        return None
+    try:
+        return orjson.loads(body)
+    except orjson.JSONDecodeError:
+        return None
+
+
+@lru_cache(maxsize=1024)
+def worker_type_for_action(action: str) -> Optional[str]:
+    """Map a parsed action to the worker type that handles it (memoized, actions repeat)"""
+    if _ROUTING_DB is not None:
+        matched = []
+        _ROUTING_DB.scan(action.encode(), match_event_handler=lambda id, start, end, flags, ctx: matched.append(id))
+        if matched:
+            # Lowest id is the highest-priority keyword, same as the loop below
+            return ROUTING_KEYWORDS[min(matched)][1]
+        return EXACT_ROUTES.get(action)
+    
+    for keyword, worker_type in ROUTING_KEYWORDS:
+        if keyword in action:
+            return worker_type
+    return EXACT_ROUTES.get(action)
+
 
 class WorkerNode:
     """Represents a registered worker node"""
+    # Fixed attribute set: no per-instance __dict__ and faster lookups in routing
+    __slots__ = ('worker_id', 'worker_type', 'capabilities', 'endpoint', 'api_key',
+                 'last_heartbeat', 'last_heartbeat_mono', 'status', 'current_tasks',
+                 'max_concurrent_tasks', 'location', 'description', 'custom_name')
+    
     def __init__(self, worker_id: str, worker_type: str, capabilities: List[str], 
                  endpoint: str, api_key: str):
         self.worker_id = worker_id
@@ -33,6 +145,7 @@ class WorkerNode:
         self.endpoint = endpoint
         self.api_key = api_key
         self.last_heartbeat = datetime.now(timezone.utc)
+        self.last_heartbeat_mono = time.monotonic()  # For timeout checks, immune to clock changes
         self.status = "online"
         self.current_tasks = 0
         self.max_concurrent_tasks = 5
@@ -41,145 +154,415 @@ class WorkerNode:
         self.location = ""
         self.description = ""
         self.custom_name = ""
+    
+    def mark_heartbeat(self):
+        """Record that the worker has just checked in"""
+        self.last_heartbeat = datetime.now(timezone.utc)
+        self.last_heartbeat_mono = time.monotonic()
 
 
 class DistributedLAMServer:
     """Central LAMControl server for distributed architecture"""
     
-    def __init__(self, host='0.0.0.0', port=5000):
+    def __init__(self, host='0.0.0.0', port=5000, async_mode=None, message_queue=None):
+        # All persistent state is read (or created) here; request handlers never read the disk
+        self._bootstrap()
+        
         self.app = Flask(__name__)
-        self.app.secret_key = self._get_or_create_secret_key()
-        self.socketio = SocketIO(self.app, cors_allowed_origins="*")
+        self.app.secret_key = self._flask_secret
+        # Set permanent session lifetime (7 days for R1)
+        self.app.permanent_session_lifetime = 7 * 24 * 60 * 60  # 7 days in seconds
+        # A Redis/KeyDB message_queue lets several server processes share broadcasts
+        self.socketio = SocketIO(self.app, cors_allowed_origins="*", async_mode=async_mode,
+                                 message_queue=message_queue)
         self.host = host
         self.port = port
         
+        # Parse each Jinja template once; routes only render them
+        self._templates = {
+            'dashboard': self.app.jinja_env.from_string(self._get_dashboard_template()),
+            'login': self.app.jinja_env.from_string(self._get_login_template()),
+            'r1_login': self.app.jinja_env.from_string(self._get_r1_login_template()),
+            'r1': self.app.jinja_env.from_string(self._get_r1_template())
+        }
+        
         # Server state
         self.workers: Dict[str, WorkerNode] = {}
-        self.pending_tasks = []
-        self.completed_tasks = []
-        self.task_queue = queue.Queue()  # Use thread-safe queue instead of asyncio.Queue
+        # Secondary index so routing only looks at workers of the needed type
+        self._workers_by_type: Dict[str, Dict[str, WorkerNode]] = defaultdict(dict)
+        # Tasks by prompt id, oldest first; bounded so status polling stays O(1) in time and memory
+        self.tasks_by_id: 'OrderedDict[str, Dict]' = OrderedDict()
+        self.max_tracked_tasks = 1000
+        # Bounded so a prompt burst gets pushed back with 503s instead of piling up in memory
+        self.task_queue = queue.Queue(maxsize=1024)
+        # Caps how many worker dispatches may be in flight at once
+        self.max_concurrent_dispatches = 64
+        self._dispatch_slots = threading.BoundedSemaphore(self.max_concurrent_dispatches)
+        
+        # Pooled keep-alive connections for dispatching tasks to workers
+        self.http = requests.Session()
+        self.http.mount('http://', HTTPAdapter(pool_connections=32, pool_maxsize=100))
+        self.http.mount('https://', HTTPAdapter(pool_connections=32, pool_maxsize=100))
+        
+        # JSON-ready worker summaries for /api/workers, refreshed only on state changes
+        self._worker_summaries: Dict[str, Dict] = {}
+        self._workers_json_bytes: Optional[bytes] = None
+        self._workers_etag: Optional[str] = None
+        
+        # Last worker state sent to the dashboard, and whether a coalesced broadcast is queued
+        self._last_broadcast_snapshot: Dict[str, Dict] = {}
+        self._broadcast_pending = False
+        
+        # Rendered (plain, gzipped, etag) bodies of pages that never change between requests
+        self._static_pages: Dict[str, tuple] = {}
+        # When set (e.g. "/_lamcontrol_static/"), authenticated page GETs are handed
+        # to nginx via X-Accel-Redirect and served from the files in cache/static
+        self.static_accel_redirect = config.config.get('static_accel_redirect', '')
+        
+        # Wall-clock ISO timestamp for payloads and logs, refreshed by a background task
+        self._now_iso = datetime.now(timezone.utc).isoformat()
+        
+        # Seconds without a heartbeat before a worker is marked offline
+        self.worker_offline_timeout = config.config.get('distributed', {}).get('worker_offline_timeout', 120)
         
         # Statistics
+        self._start_monotonic = time.monotonic()
         self.stats = {
             'uptime': datetime.now(timezone.utc),
             'total_prompts': 0,
             'completed_tasks': 0,
             'failed_tasks': 0,
-            'active_workers': 0
+            'active_workers': 0,
+            'queue_depth': 0,
+            'queue_high_water': 0
         }
         
+        # Shared worker registry for replicas behind the same Redis/KeyDB message queue
+        self.redis = self._connect_registry_store(message_queue)
+        
         # Load previously registered workers
         self._load_workers_from_disk()
+        self._load_workers_from_redis()
         
-        self.admin_credentials = self._load_admin_credentials()
         self.setup_routes()
         self.setup_socketio_events()
+        self._write_static_pages()
         
         # Start background tasks
         self.setup_background_tasks()
     
+    def _bootstrap(self):
+        """Resolve the cache directory and load or create the secret key and admin credentials"""
+        self.cache_dir = Path(config.config.get('cache_dir', 'cache'))
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.workers_file = self.cache_dir / 'workers.json'
+        
+        self._flask_secret = self._get_or_create_secret_key()
+        self.admin_credentials = self._load_admin_credentials()
+        
+        # Byte forms of the stored credentials so logins compare without re-encoding them
+        self._admin_username_bytes = self.admin_credentials['username'].encode()
+        stored_hash = self.admin_credentials.get('password_hash', '')
+        self._admin_pw_hash_bytes = None if stored_hash.startswith('$argon2') else bytes.fromhex(stored_hash)
+    
     def _get_or_create_secret_key(self):
         """Get or create a secret key for Flask sessions"""
-        secret_file = os.path.join(config.config.get('cache_dir', 'cache'), 'flask_secret.key')
+        secret_file = self.cache_dir / 'flask_secret.key'
         
-        if os.path.exists(secret_file):
-            with open(secret_file, 'r') as f:
-                return f.read().strip()
-        else:
-            os.makedirs(os.path.dirname(secret_file), exist_ok=True)
+        try:
+            return secret_file.read_text().strip()
+        except FileNotFoundError:
             secret_key = secrets.token_hex(32)
-            with open(secret_file, 'w') as f:
-                f.write(secret_key)
+            secret_file.write_text(secret_key)
             return secret_key
     
     def _load_workers_from_disk(self):
         """Load previously registered workers from disk"""
-        workers_file = os.path.join(config.config.get('cache_dir', 'cache'), 'workers.json')
-        
-        if os.path.exists(workers_file):
+        if self.workers_file.exists():
             try:
-                with open(workers_file, 'r') as f:
-                    workers_data = json.load(f)
+                workers_data = json.loads(self.workers_file.read_text())
                 
                 for worker_data in workers_data:
-                    worker = WorkerNode(
-                        worker_id=worker_data['worker_id'],
-                        worker_type=worker_data['worker_type'],
-                        capabilities=worker_data['capabilities'],
-                        endpoint=worker_data['endpoint'],
-                        api_key=worker_data['api_key']
-                    )
-                    worker.location = worker_data.get('location', '')
-                    worker.description = worker_data.get('description', '')
-                    worker.custom_name = worker_data.get('custom_name', worker_data['worker_id'])
-                    worker.status = "offline"  # Workers start offline until they send heartbeat
-                    
-                    self.workers[worker.worker_id] = worker
+                    self._add_worker(self._worker_from_record(worker_data))
                 
                 logging.info(f"Loaded {len(workers_data)} workers from disk")
             except Exception as e:
                 logging.error(f"Error loading workers from disk: {e}")
     
+    def _worker_from_record(self, worker_data: Dict) -> WorkerNode:
+        """Rebuild a WorkerNode from its persisted record"""
+        worker = WorkerNode(
+            worker_id=worker_data['worker_id'],
+            worker_type=worker_data['worker_type'],
+            capabilities=worker_data['capabilities'],
+            endpoint=worker_data['endpoint'],
+            api_key=worker_data['api_key']
+        )
+        worker.location = worker_data.get('location', '')
+        worker.description = worker_data.get('description', '')
+        worker.custom_name = worker_data.get('custom_name', worker_data['worker_id'])
+        worker.status = "offline"  # Workers start offline until they send heartbeat
+        return worker
+    
+    def _worker_record(self, worker: WorkerNode) -> Dict:
+        """Persisted form of a worker (what workers.json and Redis store)"""
+        return {
+            'worker_id': worker.worker_id,
+            'worker_type': worker.worker_type,
+            'capabilities': worker.capabilities,
+            'endpoint': worker.endpoint,
+            'api_key': worker.api_key,
+            'location': getattr(worker, 'location', ''),
+            'description': getattr(worker, 'description', ''),
+            'custom_name': getattr(worker, 'custom_name', worker.worker_id)
+        }
+    
+    def _connect_registry_store(self, redis_url: Optional[str]):
+        """Connect to Redis for the shared worker registry, if a URL was given"""
+        if not redis_url:
+            return None
+        if redis is None:
+            logging.warning("redis package not installed; worker registry stays in-process")
+            return None
+        try:
+            return redis.Redis.from_url(redis_url)
+        except Exception as e:
+            logging.error(f"Error connecting to Redis worker registry: {e}")
+            return None
+    
+    def _load_workers_from_redis(self):
+        """
+        Merge workers registered through other replicas and revive local ones they heartbeat
+        
+        A live heartbeat key means the worker is online, whichever replica it reports to.
+        """
+        if not self.redis:
+            return
+        try:
+            records = self.redis.hgetall(REDIS_WORKERS_KEY)
+            workers_data = [orjson.loads(raw) for raw in records.values()]
+            alive = self._heartbeat_keys_alive([data['worker_id'] for data in workers_data])
+            for worker_data in workers_data:
+                worker_id = worker_data['worker_id']
+                worker = self.workers.get(worker_id)
+                if worker is None:
+                    worker = self._worker_from_record(worker_data)
+                    if worker_id in alive:
+                        worker.status = "online"
+                        worker.mark_heartbeat()
+                    self._add_worker(worker)
+                elif worker.status == "offline" and worker_id in alive:
+                    worker.status = "online"
+                    worker.mark_heartbeat()
+                    self._update_worker_summary(worker)
+            self.stats['active_workers'] = len([w for w in self.workers.values() if w.status == 'online'])
+            logging.info(f"Loaded {len(records)} workers from Redis")
+        except Exception as e:
+            logging.error(f"Error loading workers from Redis: {e}")
+    
+    def _load_worker_from_redis(self, worker_id: str) -> bool:
+        """Add one worker registered through another replica (a single HGET); True if found"""
+        if not self.redis:
+            return False
+        try:
+            raw = self.redis.hget(REDIS_WORKERS_KEY, worker_id)
+            if raw is None:
+                return False
+            self._add_worker(self._worker_from_record(orjson.loads(raw)))
+            return True
+        except Exception as e:
+            logging.error(f"Error loading worker {worker_id} from Redis: {e}")
+            return False
+    
+    def _heartbeat_keys_alive(self, worker_ids: List[str]) -> Set[str]:
+        """Worker ids whose shared heartbeat key has not expired, in one pipelined round trip"""
+        if not self.redis or not worker_ids:
+            return set()
+        pipe = self.redis.pipeline(transaction=False)
+        for worker_id in worker_ids:
+            pipe.exists(REDIS_HEARTBEAT_KEY.format(worker_id))
+        return {worker_id for worker_id, exists in zip(worker_ids, pipe.execute()) if exists}
+    
+    def _mirror_worker(self, worker: WorkerNode, heartbeat: bool = False):
+        """Write a worker (and optionally a heartbeat with TTL) to the shared registry"""
+        if not self.redis:
+            return
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            if not heartbeat:
+                pipe.hset(REDIS_WORKERS_KEY, worker.worker_id, orjson.dumps(self._worker_record(worker)))
+            # The key expiring is what marks the worker offline for other replicas
+            pipe.set(REDIS_HEARTBEAT_KEY.format(worker.worker_id), self._now_iso,
+                     ex=int(self.worker_offline_timeout))
+            pipe.execute()
+        except Exception as e:
+            logging.error(f"Error mirroring worker {worker.worker_id} to Redis: {e}")
+    
+    def _unmirror_worker(self, worker_id: str):
+        """Drop a removed worker from the shared registry"""
+        if not self.redis:
+            return
+        try:
+            self.redis.pipeline(transaction=False).hdel(REDIS_WORKERS_KEY, worker_id).delete(
+                REDIS_HEARTBEAT_KEY.format(worker_id)).execute()
+        except Exception as e:
+            logging.error(f"Error removing worker {worker_id} from Redis: {e}")
+    
     def _save_workers_to_disk(self):
         """Save registered workers to disk"""
-        workers_file = os.path.join(config.config.get('cache_dir', 'cache'), 'workers.json')
-        
         try:
-            os.makedirs(os.path.dirname(workers_file), exist_ok=True)
-            
-            workers_data = []
-            for worker in self.workers.values():
-                workers_data.append({
-                    'worker_id': worker.worker_id,
-                    'worker_type': worker.worker_type,
-                    'capabilities': worker.capabilities,
-                    'endpoint': worker.endpoint,
-                    'api_key': worker.api_key,
-                    'location': getattr(worker, 'location', ''),
-                    'description': getattr(worker, 'description', ''),
-                    'custom_name': getattr(worker, 'custom_name', worker.worker_id)
-                })
+            workers_data = [self._worker_record(worker) for worker in self.workers.values()]
             
-            with open(workers_file, 'w') as f:
+            with open(self.workers_file, 'w') as f:
                 json.dump(workers_data, f, indent=2)
             
             logging.info(f"Saved {len(workers_data)} workers to disk")
         except Exception as e:
             logging.error(f"Error saving workers to disk: {e}")
 
+    def _add_worker(self, worker: WorkerNode):
+        """Add a worker to the registry and its type index"""
+        self.workers[worker.worker_id] = worker
+        self._workers_by_type[worker.worker_type][worker.worker_id] = worker
+        self._update_worker_summary(worker)
+    
+    def _remove_worker(self, worker_id: str):
+        """Remove a worker from the registry and its type index"""
+        worker = self.workers.pop(worker_id)
+        self._workers_by_type[worker.worker_type].pop(worker_id, None)
+        self._remove_worker_summary(worker_id)
+    
+    def _update_worker_summary(self, worker: WorkerNode):
+        """Refresh the cached /api/workers entry after a worker state change"""
+        self._worker_summaries[worker.worker_id] = {
+            'worker_id': worker.worker_id,
+            'worker_type': worker.worker_type,
+            'capabilities': worker.capabilities,
+            'status': worker.status,
+            'current_tasks': worker.current_tasks,
+            'last_heartbeat': worker.last_heartbeat.isoformat(),
+            'location': getattr(worker, 'location', ''),
+            'description': getattr(worker, 'description', ''),
+            'custom_name': getattr(worker, 'custom_name', ''),
+            'endpoint': worker.endpoint
+        }
+        self._workers_json_bytes = None
+    
+    def _remove_worker_summary(self, worker_id: str):
+        """Drop a removed worker from the cached /api/workers payload"""
+        self._worker_summaries.pop(worker_id, None)
+        self._workers_json_bytes = None
+    
+    def _get_workers_json(self):
+        """Return the serialized /api/workers payload and its ETag, rebuilding only when stale"""
+        if self._workers_json_bytes is None:
+            summaries = list(self._worker_summaries.values())
+            body = orjson.dumps({
+                'workers': summaries,
+                'total_workers': len(summaries),
+                'online_workers': sum(1 for w in summaries if w['status'] == 'online')
+            })
+            self._workers_etag = hashlib.blake2b(body, digest_size=8).hexdigest()
+            self._workers_json_bytes = body
+        return self._workers_json_bytes, self._workers_etag
+
+    def _render(self, name: str, **context) -> str:
+        """Render one of the precompiled page templates"""
+        return self._templates[name].render(**context)
+    
+    def _render_static_page(self, name: str, render):
+        """Render a static page once and keep its plain and gzipped bodies"""
+        body = render().encode('utf-8')
+        page = (body, gzip.compress(body, 9), hashlib.blake2b(body, digest_size=8).hexdigest())
+        self._static_pages[name] = page
+        return page
+    
+    def _write_static_pages(self):
+        """Render the dashboard and R1 page at startup and write them to cache/static"""
+        static_dir = self.cache_dir / 'static'
+        pages = {
+            'dashboard': lambda: self._render('dashboard'),
+            'r1': lambda: self._render('r1')
+        }
+        
+        try:
+            static_dir.mkdir(exist_ok=True)
+            for name, render in pages.items():
+                body, body_gz, _ = self._render_static_page(name, render)
+                # page.html + page.html.gz lets nginx gzip_static serve them without Python
+                (static_dir / f'{name}.html').write_bytes(body)
+                (static_dir / f'{name}.html.gz').write_bytes(body_gz)
+        except Exception as e:
+            logging.error(f"Error writing static pages: {e}")
+    
+    def _static_page_response(self, name: str, render):
+        """Serve a page that renders identically every time from a precompressed cache"""
+        if self.static_accel_redirect:
+            # Auth has already been checked; let the reverse proxy send the file
+            response = Response(mimetype='text/html')
+            response.headers['X-Accel-Redirect'] = f"{self.static_accel_redirect.rstrip('/')}/{name}.html"
+            return response
+        
+        page = self._static_pages.get(name) or self._render_static_page(name, render)
+        body, body_gz, etag = page
+        if 'gzip' in request.headers.get('Accept-Encoding', ''):
+            response = Response(body_gz, mimetype='text/html')
+            response.headers['Content-Encoding'] = 'gzip'
+        else:
+            response = Response(body, mimetype='text/html')
+        response.headers['Vary'] = 'Accept-Encoding'
+        # Pages sit behind a login, so only the browser may keep them and must revalidate
+        response.headers['Cache-Control'] = 'private, no-cache'
+        response.set_etag(etag)
+        return response.make_conditional(request)
+
+    def _track_task(self, task: Dict, status: str = 'pending'):
+        """Record a task for status lookups, evicting the oldest beyond max_tracked_tasks"""
+        task['status'] = status
+        self.tasks_by_id[task['id']] = task
+        while len(self.tasks_by_id) > self.max_tracked_tasks:
+            self.tasks_by_id.popitem(last=False)
+
     def _load_admin_credentials(self):
         """Load or create admin credentials"""
-        creds_file = os.path.join(config.config.get('cache_dir', 'cache'), 'admin_creds.json')
-        
-        if os.path.exists(creds_file):
-            with open(creds_file, 'r') as f:
-                creds = json.load(f)
-                # Always print credentials on startup for convenience
-                print(f"\n=== ADMIN CREDENTIALS ===")
-                print(f"Username: {creds['username']}")
-                print(f"Password: [Check admin_creds.json file for password]")
-                print(f"Admin Dashboard: http://localhost:5000")
-                print(f"R1 Login: http://localhost:5000/r1/login")
-                print(f"========================\n")
-                return creds
+        creds_file = self.cache_dir / 'admin_creds.json'
+        
+        if creds_file.exists():
+            creds = json.loads(creds_file.read_text())
+            # Older installs kept the plain password beside its hash; show it one last time and drop it
+            legacy_password = creds.pop('password', None)
+            if legacy_password is not None:
+                creds_file.write_text(json.dumps(creds, indent=2))
+            # Always print credentials on startup for convenience
+            print(f"\n=== ADMIN CREDENTIALS ===")
+            print(f"Username: {creds['username']}")
+            if legacy_password is not None:
+                print(f"Password: {legacy_password}")
+                print(f"The password is now stored only as a hash; save it safely!")
+            else:
+                print(f"Password: [Shown only when the credentials were created]")
+            print(f"Admin Dashboard: http://localhost:5000")
+            print(f"R1 Login: http://localhost:5000/r1/login")
+            print(f"========================\n")
+            return creds
         else:
-            os.makedirs(os.path.dirname(creds_file), exist_ok=True)
             username = 'admin'
             password = secrets.token_urlsafe(16)
-            password_hash = hashlib.sha256(password.encode()).hexdigest()
+            if _password_hasher:
+                password_hash = _password_hasher.hash(password)
+            else:
+                password_hash = hashlib.sha256(password.encode()).hexdigest()
             
             creds = {
                 'username': username,
-                'password': password,  # Store plain password for display
                 'password_hash': password_hash,
                 'created_at': datetime.now(timezone.utc).isoformat()
             }
             
-            with open(creds_file, 'w') as f:
-                json.dump(creds, f, indent=2)
+            creds_file.write_text(json.dumps(creds, indent=2))
             
-            # Log credentials for first time setup
-            logging.info(f"Created admin credentials - Username: {username}, Password: {password}")
+            # Only the hash is kept, so this is the one time the password is shown
+            logging.info(f"Created admin credentials - Username: {username}")
             print(f"\n=== ADMIN CREDENTIALS ===")
             print(f"Username: {username}")
             print(f"Password: {password}")
@@ -195,65 +578,74 @@ class DistributedLAMServer:
         @wraps(f)
         def decorated_function(*args, **kwargs):
             if 'authenticated' not in session or not session['authenticated']:
-                return jsonify({'error': 'Authentication required'}), 401
+                return ojsonify({'error': 'Authentication required'}), 401
             return f(*args, **kwargs)
         return decorated_function
     
     def setup_background_tasks(self):
         """Setup background tasks for worker management"""
+        def dispatch(task):
+            """Route a single task, freeing its dispatch slot when done"""
+            try:
+                self._route_task_to_worker_sync(task)
+            except Exception as e:
+                logging.error(f"Error processing task: {e}")
+            finally:
+                self._dispatch_slots.release()
+                self.task_queue.task_done()
+        
         def task_processor():
-            """Process queued tasks"""
+            """Hand queued tasks to concurrent dispatchers so a slow worker can't stall the rest"""
+            while True:
+                # Blocks until a task arrives; under eventlet this parks the green thread
+                task = self.task_queue.get()
+                self._dispatch_slots.acquire()
+                self.socketio.start_background_task(dispatch, task)
+        
+        def heartbeat_sweeper():
+            """Flip workers with stale heartbeats offline in one pass per window"""
             while True:
+                self.socketio.sleep(5)
                 try:
-                    # Get task from queue (blocks until available)
-                    task = self.task_queue.get(timeout=1)
-                    self._route_task_to_worker_sync(task)
-                    self.task_queue.task_done()
-                except queue.Empty:
-                    continue
+                    self._check_worker_heartbeats()
                 except Exception as e:
-                    logging.error(f"Error processing task: {e}")
+                    logging.error(f"Error checking worker heartbeats: {e}")
         
-        def heartbeat_checker():
-            """Check worker heartbeats"""
+        def clock_updater():
+            """Keep the cached ISO timestamp within half a second of now"""
             while True:
-                self._check_worker_heartbeats()
-                threading.Event().wait(30)  # Check every 30 seconds
-        
-        # Start background threads
-        task_thread = threading.Thread(target=task_processor, daemon=True)
-        heartbeat_thread = threading.Thread(target=heartbeat_checker, daemon=True)
+                self.socketio.sleep(0.5)
+                self._now_iso = datetime.now(timezone.utc).isoformat()
         
-        task_thread.start()
-        heartbeat_thread.start()
+        # Green threads under eventlet, regular daemon threads otherwise
+        self.socketio.start_background_task(task_processor)
+        self.socketio.start_background_task(heartbeat_sweeper)
+        self.socketio.start_background_task(clock_updater)
     
     def _route_task_to_worker_sync(self, task: Dict):
         """Route task to appropriate worker node (synchronous version)"""
         try:
-            action = task.get('action', '').lower()
-            
-            # Determine worker type needed
-            worker_type = None
-            if any(keyword in action for keyword in ['browser', 'google', 'youtube', 'site', 'amazon']):
-                worker_type = 'browser'
-            elif any(keyword in action for keyword in ['computer', 'volume', 'media', 'run', 'power']):
-                worker_type = 'computer'
-            elif any(keyword in action for keyword in ['discord', 'telegram', 'messenger']):
-                worker_type = 'messaging'
-            elif action in ['ai', 'openinterpreter']:
-                worker_type = 'ai'
+            # Classified when the task was created in _process_prompt
+            worker_type = task.get('worker_type') or worker_type_for_action(task.get('action', '').lower())
             
             if not worker_type:
-                logging.warning(f"No worker type determined for action: {action}")
+                logging.warning(f"No worker type determined for action: {task.get('action', '')}")
                 return
             
             # Find available worker
             available_workers = [
-                w for w in self.workers.values()
-                if w.worker_type == worker_type and w.status == 'online' 
-                and w.current_tasks < w.max_concurrent_tasks
+                w for w in self._workers_by_type[worker_type].values()
+                if w.status == 'online' and w.current_tasks < w.max_concurrent_tasks
             ]
             
+            if not available_workers and self.redis:
+                # Workers registered or heartbeating through other replicas
+                self._load_workers_from_redis()
+                available_workers = [
+                    w for w in self._workers_by_type[worker_type].values()
+                    if w.status == 'online' and w.current_tasks < w.max_concurrent_tasks
+                ]
+            
             if not available_workers:
                 logging.warning(f"No available {worker_type} workers")
                 self.stats['failed_tasks'] += 1
@@ -265,12 +657,22 @@ class DistributedLAMServer:
                 })
                 return
             
-            # Select worker (simple round-robin or least loaded)
-            worker = min(available_workers, key=lambda w: w.current_tasks)
+            # Power of two choices: sample two workers and take the less loaded one.
+            # Near least-loaded balance without trusting every current_tasks count.
+            if len(available_workers) == 1:
+                worker = available_workers[0]
+            else:
+                a, b = random.sample(available_workers, 2)
+                worker = a if a.current_tasks <= b.current_tasks else b
+            
+            # Count the task against the worker while it is in flight so concurrent
+            # dispatches see the load; the worker's heartbeat reports the real count
+            worker.current_tasks += 1
+            self._update_worker_summary(worker)
             
             # Send task to worker
             try:
-                response = requests.post(
+                response = self.http.post(
                     f"{worker.endpoint}/execute",
                     json={'task': task},
                     headers={'Authorization': f'Bearer {worker.api_key}'},
@@ -278,26 +680,38 @@ class DistributedLAMServer:
                 )
                 
                 if response.status_code == 200:
-                    worker.current_tasks += 1
                     self.stats['completed_tasks'] += 1
-                    logging.info(f"Task {task['id']} sent to worker {worker.worker_id}")
+                    
+                    # Parse the worker's acceptance straight from the raw bytes
+                    try:
+                        accepted = orjson.loads(response.content)
+                    except orjson.JSONDecodeError:
+                        accepted = {}
+                    task['worker_task_id'] = accepted.get('task_id')
+                    logging.info(f"Task {task['id']} sent to worker {worker.worker_id} "
+                                 f"(worker task {task['worker_task_id']})")
                     
                     # Broadcast status update
                     self.socketio.emit('task_status', {
                         'task_id': task['id'],
                         'status': 'executing',
                         'worker': worker.worker_id,
-                        'message': f'Task sent to {worker.worker_type} worker'
+                        'worker_task_id': task['worker_task_id'],
+                        'message': accepted.get('message', f'Task sent to {worker.worker_type} worker')
                     })
                 else:
                     logging.error(f"Worker {worker.worker_id} returned {response.status_code}")
                     self.stats['failed_tasks'] += 1
+                    worker.current_tasks = max(0, worker.current_tasks - 1)
+                    self._update_worker_summary(worker)
                     
             except requests.exceptions.RequestException as e:
                 logging.error(f"Failed to send task to worker {worker.worker_id}: {e}")
                 self.stats['failed_tasks'] += 1
+                worker.current_tasks = max(0, worker.current_tasks - 1)
                 # Mark worker as offline
                 worker.status = 'offline'
+                self._update_worker_summary(worker)
                 
         except Exception as e:
             logging.error(f"Error routing task: {e}")
@@ -305,15 +719,33 @@ class DistributedLAMServer:
     
     def _check_worker_heartbeats(self):
         """Check if workers are still alive"""
-        current_time = datetime.now(timezone.utc)
+        now = time.monotonic()
         offline_workers = []
         
-        for worker_id, worker in self.workers.items():
-            if (current_time - worker.last_heartbeat).seconds > 120:  # 2 minutes timeout
-                worker.status = "offline"
-                offline_workers.append(worker_id)
+        stale = [
+            worker for worker in list(self.workers.values())
+            if worker.status == "online" and now - worker.last_heartbeat_mono > self.worker_offline_timeout
+        ]
+        if not stale:
+            return
+        
+        # Workers may be heartbeating through another replica
+        try:
+            alive = self._heartbeat_keys_alive([worker.worker_id for worker in stale])
+        except Exception as e:
+            logging.error(f"Error checking heartbeats in Redis: {e}")
+            alive = set()
+        
+        for worker in stale:
+            if worker.worker_id in alive:
+                worker.mark_heartbeat()
+                continue
+            worker.status = "offline"
+            offline_workers.append(worker.worker_id)
+            self._update_worker_summary(worker)
         
         if offline_workers:
+            self.stats['active_workers'] = len([w for w in self.workers.values() if w.status == 'online'])
             logging.warning(f"Workers gone offline: {offline_workers}")
             self.broadcast_worker_update()
     
@@ -332,8 +764,10 @@ class DistributedLAMServer:
         def handle_worker_heartbeat(data):
             worker_id = data.get('worker_id')
             if worker_id in self.workers:
-                self.workers[worker_id].last_heartbeat = datetime.now(timezone.utc)
+                self.workers[worker_id].mark_heartbeat()
                 self.workers[worker_id].status = data.get('status', 'online')
+                self._update_worker_summary(self.workers[worker_id])
+                self._mirror_worker(self.workers[worker_id], heartbeat=True)
     
     def setup_routes(self):
         """Setup Flask routes"""
@@ -342,7 +776,8 @@ class DistributedLAMServer:
         def index():
             if 'authenticated' not in session or not session['authenticated']:
                 return redirect(url_for('login'))
-            return render_template_string(self._get_dashboard_template())
+            return self._static_page_response(
+                'dashboard', lambda: self._render('dashboard'))
         
         @self.app.route('/login', methods=['GET', 'POST'])
         def login():
@@ -356,9 +791,9 @@ class DistributedLAMServer:
                     session.permanent = True  # Make session persistent for R1
                     return redirect(url_for('index'))
                 else:
-                    return render_template_string(self._get_login_template(), error="Invalid credentials")
+                    return self._render('login', error="Invalid credentials")
             
-            return render_template_string(self._get_login_template())
+            return self._render('login')
         
         @self.app.route('/logout')
         def logout():
@@ -370,23 +805,31 @@ class DistributedLAMServer:
         def receive_prompt():
             """Main endpoint for R1 to send prompts"""
             try:
-                data = request.get_json()
+                data = request_json()
                 if not data or 'prompt' not in data:
-                    return jsonify({'error': 'No prompt provided'}), 400
+                    return ojsonify({'error': 'No prompt provided'}), 400
                 
                 prompt_id = secrets.token_hex(8)
                 prompt_data = {
                     'id': prompt_id,
                     'prompt': data['prompt'],
-                    'timestamp': datetime.now(timezone.utc).isoformat(),
+                    'timestamp': self._now_iso,
                     'source': data.get('source', 'r1'),
                     'metadata': data.get('metadata', {})
                 }
+                self._track_task(prompt_data)
                 
                 # Process prompt with LLM
                 response = self._process_prompt(prompt_data)
                 
-                return jsonify({
+                if response.get('status') == 'busy':
+                    # Never queued, so don't leave it looking pending to status polls
+                    self.tasks_by_id.pop(prompt_id, None)
+                    busy = ojsonify({'status': 'busy', 'id': prompt_id, 'response': response}, 503)
+                    busy.headers['Retry-After'] = str(response['retry_after'])
+                    return busy
+                
+                return ojsonify({
                     'status': 'success',
                     'id': prompt_id,
                     'response': response
@@ -394,31 +837,28 @@ class DistributedLAMServer:
                 
             except Exception as e:
                 logging.error(f"Error processing prompt: {e}")
-                return jsonify({'error': 'Failed to process prompt'}), 500
+                return ojsonify({'error': 'Failed to process prompt'}), 500
         
         @self.app.route('/api/prompt/<prompt_id>/status', methods=['GET'])
         def get_prompt_status(prompt_id):
             """Get status of a specific prompt"""
-            # Find prompt in completed tasks
-            for task in self.completed_tasks:
-                if task.get('id') == prompt_id:
-                    return jsonify({
-                        'status': 'completed',
-                        'id': prompt_id,
-                        'result': task.get('result', {}),
-                        'timestamp': task.get('timestamp')
-                    })
+            task = self.tasks_by_id.get(prompt_id)
+            if task is None:
+                return ojsonify({'error': 'Prompt not found'}), 404
             
-            # Check if still pending
-            for task in self.pending_tasks:
-                if task.get('id') == prompt_id:
-                    return jsonify({
-                        'status': 'pending',
-                        'id': prompt_id,
-                        'timestamp': task.get('timestamp')
-                    })
+            if task.get('status') == 'completed':
+                return ojsonify({
+                    'status': 'completed',
+                    'id': prompt_id,
+                    'result': task.get('result', {}),
+                    'timestamp': task.get('timestamp')
+                })
             
-            return jsonify({'error': 'Prompt not found'}), 404
+            return ojsonify({
+                'status': 'pending',
+                'id': prompt_id,
+                'timestamp': task.get('timestamp')
+            })
         
         # R1 Web Interface for browser navigation
         @self.app.route('/r1', methods=['GET', 'POST'])
@@ -432,35 +872,37 @@ class DistributedLAMServer:
                 # Handle form submission from R1
                 prompt = request.form.get('prompt', '').strip()
                 if not prompt:
-                    return render_template_string(self._get_r1_template(), 
-                                                error="Please enter a command")
+                    return self._render('r1', error="Please enter a command")
                 
                 try:
                     # Process the prompt
                     prompt_data = {
                         'id': secrets.token_hex(8),
                         'prompt': prompt,
-                        'timestamp': datetime.now(timezone.utc).isoformat(),
+                        'timestamp': self._now_iso,
                         'source': 'r1_web',
                         'metadata': {'interface': 'web'}
                     }
                     
-                    # Add to pending tasks for tracking
-                    self.pending_tasks.append(prompt_data)
+                    # Track the task so the R1 page can poll its status
+                    self._track_task(prompt_data)
                     
                     response = self._process_prompt(prompt_data)
                     
-                    return render_template_string(self._get_r1_template(), 
-                                                success=f"Command sent: {prompt}",
-                                                task_id=prompt_data['id'],
-                                                response=response.get('message', 'Processing...'))
+                    if response.get('status') == 'busy':
+                        self.tasks_by_id.pop(prompt_data['id'], None)
+                        return self._render('r1', error=response['message'])
+                    
+                    return self._render('r1', success=f"Command sent: {prompt}",
+                                        task_id=prompt_data['id'],
+                                        response=response.get('message', 'Processing...'))
                 
                 except Exception as e:
                     logging.error(f"Error processing R1 prompt: {e}")
-                    return render_template_string(self._get_r1_template(), 
-                                                error="Failed to process command")
+                    return self._render('r1', error="Failed to process command")
             
-            return render_template_string(self._get_r1_template())
+            return self._static_page_response(
+                'r1', lambda: self._render('r1'))
         
         # R1 Login page
         @self.app.route('/r1/login', methods=['GET', 'POST'])
@@ -476,11 +918,10 @@ class DistributedLAMServer:
                     session.permanent = True  # Make session persistent for R1
                     return redirect(url_for('r1_interface'))
                 else:
-                    return render_template_string(self._get_r1_login_template(), 
-                                                error="Invalid credentials")
+                    return self._render('r1_login', error="Invalid credentials")
             
             # GET request - show login form
-            return render_template_string(self._get_r1_login_template())
+            return self._render('r1_login')
             
         @self.app.route('/r1/logout')
         def r1_logout():
@@ -491,43 +932,41 @@ class DistributedLAMServer:
         @self.app.route('/api/task/<task_id>/status', methods=['GET'])
         def get_task_status(task_id):
             """Get real-time status of a task (for R1 interface)"""
-            # Check pending tasks
-            for task in self.pending_tasks:
-                if task.get('id') == task_id:
-                    return jsonify({
-                        'status': 'pending',
-                        'id': task_id,
-                        'timestamp': task.get('timestamp'),
-                        'message': 'Task is being processed...'
-                    })
+            task = self.tasks_by_id.get(task_id)
+            if task is None:
+                return ojsonify({'error': 'Task not found'}), 404
             
-            # Check completed tasks
-            for task in self.completed_tasks:
-                if task.get('id') == task_id:
-                    return jsonify({
-                        'status': 'completed',
-                        'id': task_id,
-                        'result': task.get('result', {}),
-                        'timestamp': task.get('completed_at', task.get('timestamp')),
-                        'worker_id': task.get('worker_id', 'unknown'),
-                        'success': task.get('result', {}).get('success', False),
-                        'message': task.get('result', {}).get('message', 'Task completed'),
-                        'output': task.get('result', {}).get('output', '')
-                    })
+            if task.get('status') == 'completed':
+                result = task.get('result', {})
+                return ojsonify({
+                    'status': 'completed',
+                    'id': task_id,
+                    'result': result,
+                    'timestamp': task.get('completed_at', task.get('timestamp')),
+                    'worker_id': task.get('worker_id', 'unknown'),
+                    'success': result.get('success', False),
+                    'message': result.get('message', 'Task completed'),
+                    'output': result.get('output', '')
+                })
             
-            return jsonify({'error': 'Task not found'}), 404
+            return ojsonify({
+                'status': 'pending',
+                'id': task_id,
+                'timestamp': task.get('timestamp'),
+                'message': 'Task is being processed...'
+            })
         
         # Worker Management Endpoints
         @self.app.route('/api/worker/register', methods=['POST'])
         def register_worker():
             """Register a new worker node"""
             try:
-                data = request.get_json()
+                data = request_json()
                 
                 # Validate required fields
                 required_fields = ['worker_type', 'capabilities', 'endpoint']
                 if not all(field in data for field in required_fields):
-                    return jsonify({'error': 'Missing required fields: worker_type, capabilities, endpoint'}), 400
+                    return ojsonify({'error': 'Missing required fields: worker_type, capabilities, endpoint'}), 400
                 
                 # Use custom worker_name if provided, otherwise generate one
                 custom_name = data.get('worker_name', '').strip()
@@ -538,7 +977,7 @@ class DistributedLAMServer:
                 
                 # Check if worker already exists
                 if worker_id in self.workers:
-                    return jsonify({'error': f'Worker {worker_id} already registered'}), 409
+                    return ojsonify({'error': f'Worker {worker_id} already registered'}), 409
                 
                 # Create worker node
                 worker = WorkerNode(
@@ -554,7 +993,8 @@ class DistributedLAMServer:
                 worker.description = data.get('description', '')
                 worker.custom_name = custom_name
                 
-                self.workers[worker.worker_id] = worker
+                self._add_worker(worker)
+                self._mirror_worker(worker)
                 self.stats['active_workers'] = len([w for w in self.workers.values() if w.status == 'online'])
                 
                 # Save workers to disk for persistence
@@ -563,7 +1003,7 @@ class DistributedLAMServer:
                 logging.info(f"Registered worker: {worker.worker_id} ({worker.worker_type}) at {worker.endpoint}")
                 self.broadcast_worker_update()
                 
-                return jsonify({
+                return ojsonify({
                     'status': 'success',
                     'worker_id': worker.worker_id,
                     'api_key': worker.api_key,
@@ -572,88 +1012,87 @@ class DistributedLAMServer:
                 
             except Exception as e:
                 logging.error(f"Error registering worker: {e}")
-                return jsonify({'error': 'Failed to register worker'}), 500
+                return ojsonify({'error': 'Failed to register worker'}), 500
         
         @self.app.route('/api/worker/<worker_id>/heartbeat', methods=['POST'])
         def worker_heartbeat(worker_id):
             """Receive heartbeat from worker"""
+            if worker_id not in self.workers:
+                # May have registered through another replica; look up just this id
+                self._load_worker_from_redis(worker_id)
+            
             if worker_id in self.workers:
-                self.workers[worker_id].last_heartbeat = datetime.now(timezone.utc)
+                self.workers[worker_id].mark_heartbeat()
                 self.workers[worker_id].status = 'online'
                 
                 # Update task count and status if provided
-                data = request.get_json() or {}
+                data = request_json() or {}
                 if 'current_tasks' in data:
                     self.workers[worker_id].current_tasks = data['current_tasks']
                 if 'status' in data:
                     self.workers[worker_id].status = data['status']
+                self._update_worker_summary(self.workers[worker_id])
+                self._mirror_worker(self.workers[worker_id], heartbeat=True)
                 
-                return jsonify({'status': 'success'})
+                return ojsonify({'status': 'success'})
             else:
-                return jsonify({'error': 'Worker not found'}), 404
+                return ojsonify({'error': 'Worker not found'}), 404
         
         @self.app.route('/api/workers', methods=['GET'])
         @self.require_auth
         def get_workers():
             """Get list of all workers (admin only)"""
-            workers_data = []
-            for worker in self.workers.values():
-                workers_data.append({
-                    'worker_id': worker.worker_id,
-                    'worker_type': worker.worker_type,
-                    'capabilities': worker.capabilities,
-                    'status': worker.status,
-                    'current_tasks': worker.current_tasks,
-                    'last_heartbeat': worker.last_heartbeat.isoformat(),
-                    'location': getattr(worker, 'location', ''),
-                    'description': getattr(worker, 'description', ''),
-                    'custom_name': getattr(worker, 'custom_name', ''),
-                    'endpoint': worker.endpoint
-                })
-            
-            return jsonify({
-                'workers': workers_data,
-                'total_workers': len(workers_data),
-                'online_workers': len([w for w in workers_data if w['status'] == 'online'])
-            })
+            body, etag = self._get_workers_json()
+            response = Response(body, mimetype='application/json')
+            response.set_etag(etag)
+            # Answers 304 Not Modified when the dashboard already has this snapshot
+            return response.make_conditional(request)
         
         @self.app.route('/api/worker/<worker_id>/remove', methods=['DELETE'])
         @self.require_auth
         def remove_worker(worker_id):
             """Remove a worker (admin only)"""
             if worker_id in self.workers:
-                del self.workers[worker_id]
+                self._remove_worker(worker_id)
+                self._unmirror_worker(worker_id)
                 self.stats['active_workers'] = len([w for w in self.workers.values() if w.status == 'online'])
                 logging.info(f"Removed worker: {worker_id}")
                 self.broadcast_worker_update()
-                return jsonify({'status': 'success', 'message': f'Worker {worker_id} removed'})
+                return ojsonify({'status': 'success', 'message': f'Worker {worker_id} removed'})
             else:
-                return jsonify({'error': 'Worker not found'}), 404
+                return ojsonify({'error': 'Worker not found'}), 404
         
         @self.app.route('/api/health', methods=['GET'])
         def health_check():
             """Health check endpoint"""
-            return jsonify({
+            return ojsonify({
                 'status': 'healthy',
-                'timestamp': datetime.now(timezone.utc).isoformat(),
+                'timestamp': self._now_iso,
                 'workers': len(self.workers),
                 'online_workers': len([w for w in self.workers.values() if w.status == 'online']),
-                'uptime': (datetime.now(timezone.utc) - self.stats['uptime']).total_seconds(),
-                'stats': self.stats
+                'uptime': time.monotonic() - self._start_monotonic,
+                'stats': dict(self.stats, queue_depth=self.task_queue.qsize())
             })
     
     def _verify_password(self, username: str, password: str) -> bool:
         """Verify admin credentials"""
-        if username != self.admin_credentials["username"]:
+        if not username or not password:
+            return False
+        
+        # compare_digest takes the same time wherever the first mismatch is
+        if not hmac.compare_digest(username.encode(), self._admin_username_bytes):
             return False
         
-        # Check if we have a plain password stored (for new installs)
-        if 'password' in self.admin_credentials:
-            return password == self.admin_credentials['password']
+        if self._admin_pw_hash_bytes is None:
+            if not _password_hasher:
+                logging.error("Admin password hash needs argon2-cffi: pip install argon2-cffi")
+                return False
+            try:
+                return _password_hasher.verify(self.admin_credentials["password_hash"], password)
+            except (VerificationError, InvalidHashError):
+                return False
         
-        # Fallback to hash verification (for older installs)
-        password_hash = hashlib.sha256(password.encode()).hexdigest()
-        return password_hash == self.admin_credentials["password_hash"]
+        return hmac.compare_digest(hashlib.sha256(password.encode()).digest(), self._admin_pw_hash_bytes)
     
     def _process_prompt(self, prompt_data: Dict) -> Dict:
         """Process prompt with LLM and route to appropriate worker"""
@@ -665,18 +1104,35 @@ class DistributedLAMServer:
                 # Not a command for LAMControl
                 return {'status': 'ignored', 'message': 'Prompt sent to R1'}
             
+            # Classify once here; routing (and any re-dispatch) just reads worker_type
+            action = result.get('action', '')
+            worker_type = worker_type_for_action(action.lower())
+            if not worker_type:
+                logging.warning(f"No worker type determined for action: {action}")
+                return {'status': 'error', 'message': f"No worker handles action: {action}"}
+            
             # Create task for worker routing
             task = {
                 'id': prompt_data['id'],
                 'prompt': prompt_data['prompt'],
-                'action': result.get('action', ''),
+                'action': action,
+                'worker_type': worker_type,
                 'parameters': result.get('parameters', {}),
                 'timestamp': prompt_data['timestamp'],
                 'source': prompt_data['source']
             }
             
             # Add to task queue for processing
-            self.task_queue.put(task)
+            try:
+                self.task_queue.put_nowait(task)
+            except queue.Full:
+                logging.warning(f"Task queue full, rejecting task {task['id']}")
+                return {'status': 'busy', 'message': 'Server is busy, try again shortly', 'retry_after': 1}
+            
+            depth = self.task_queue.qsize()
+            self.stats['queue_depth'] = depth
+            if depth > self.stats['queue_high_water']:
+                self.stats['queue_high_water'] = depth
             
             self.stats['total_prompts'] += 1
             
@@ -693,19 +1149,39 @@ class DistributedLAMServer:
             return {'status': 'error', 'message': str(e)}
     
     def broadcast_worker_update(self):
-        """Broadcast worker status update to connected clients"""
+        """Schedule a worker status update for connected clients, coalescing bursts"""
+        if self._broadcast_pending:
+            return
+        self._broadcast_pending = True
+        self.socketio.start_background_task(self._flush_worker_update)
+    
+    def _flush_worker_update(self):
+        """Emit what changed since the last broadcast, after a 100ms coalescing window"""
+        self.socketio.sleep(0.1)
+        self._broadcast_pending = False
         try:
-            self.socketio.emit('worker_update', {
-                'workers': [
-                    {
-                        'worker_id': w.worker_id,
-                        'worker_type': w.worker_type,
-                        'status': w.status,
-                        'current_tasks': w.current_tasks
-                    }
-                    for w in self.workers.values()
-                ]
-            }, room='admin')
+            snapshot = {
+                w.worker_id: {
+                    'worker_id': w.worker_id,
+                    'worker_type': w.worker_type,
+                    'status': w.status,
+                    'current_tasks': w.current_tasks
+                }
+                for w in list(self.workers.values())
+            }
+            previous = self._last_broadcast_snapshot
+            added = [w for worker_id, w in snapshot.items() if worker_id not in previous]
+            changed = [w for worker_id, w in snapshot.items()
+                       if worker_id in previous and previous[worker_id] != w]
+            removed = [worker_id for worker_id in previous if worker_id not in snapshot]
+            self._last_broadcast_snapshot = snapshot
+            
+            if added or changed or removed:
+                self.socketio.emit('worker_update', {
+                    'added': added,
+                    'changed': changed,
+                    'removed': removed
+                }, room='admin')
         except Exception as e:
             logging.error(f"Error broadcasting worker update: {e}")
     
@@ -969,11 +1445,9 @@ class DistributedLAMServer:
 </html>
         '''
     
-    def _get_r1_login_template(self, error=None):
+    def _get_r1_login_template(self):
         """Get R1 login template"""
-        error_html = f"<div class='error'>{error}</div>" if error else ""
-        
-        return f'''
+        return '''
 <!DOCTYPE html>
 <html>
 <head>
@@ -981,18 +1455,18 @@ class DistributedLAMServer:
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <style>
-        body {{ font-family: Arial, sans-serif; background: #f0f0f0; display: flex; justify-content: center; align-items: center; height: 100vh; margin: 0; }}
-        .login-container {{ background: white; padding: 30px; border-radius: 10px; width: 400px; box-shadow: 0 4px 6px rgba(0,0,0,0.1); }}
-        .logo {{ text-align: center; margin-bottom: 20px; }}
-        .logo h1 {{ color: #ff6600; margin: 0; font-size: 28px; }}
-        .logo p {{ color: #666; margin: 5px 0 0 0; }}
-        .form-group {{ margin: 15px 0; }}
-        label {{ display: block; margin-bottom: 5px; font-weight: bold; color: #333; }}
-        input {{ width: 100%; padding: 15px; font-size: 16px; border: 2px solid #ddd; border-radius: 5px; box-sizing: border-box; }}
-        button {{ width: 100%; padding: 15px; font-size: 16px; background: #ff6600; color: white; border: none; border-radius: 5px; cursor: pointer; }}
-        button:hover {{ background: #e55a00; }}
-        .error {{ background: #f8d7da; color: #721c24; padding: 10px; border-radius: 5px; margin: 10px 0; text-align: center; }}
-        .info {{ background: #e7f3ff; color: #004085; padding: 15px; border-radius: 5px; margin: 15px 0; text-align: center; }}
+        body { font-family: Arial, sans-serif; background: #f0f0f0; display: flex; justify-content: center; align-items: center; height: 100vh; margin: 0; }
+        .login-container { background: white; padding: 30px; border-radius: 10px; width: 400px; box-shadow: 0 4px 6px rgba(0,0,0,0.1); }
+        .logo { text-align: center; margin-bottom: 20px; }
+        .logo h1 { color: #ff6600; margin: 0; font-size: 28px; }
+        .logo p { color: #666; margin: 5px 0 0 0; }
+        .form-group { margin: 15px 0; }
+        label { display: block; margin-bottom: 5px; font-weight: bold; color: #333; }
+        input { width: 100%; padding: 15px; font-size: 16px; border: 2px solid #ddd; border-radius: 5px; box-sizing: border-box; }
+        button { width: 100%; padding: 15px; font-size: 16px; background: #ff6600; color: white; border: none; border-radius: 5px; cursor: pointer; }
+        button:hover { background: #e55a00; }
+        .error { background: #f8d7da; color: #721c24; padding: 10px; border-radius: 5px; margin: 10px 0; text-align: center; }
+        .info { background: #e7f3ff; color: #004085; padding: 15px; border-radius: 5px; margin: 15px 0; text-align: center; }
     </style>
 </head>
 <body>
@@ -1008,7 +1482,7 @@ class DistributedLAMServer:
             You won't need to log in again on this device.
         </div>
         
-        {error_html}
+        {% if error %}<div class='error'>{{ error }}</div>{% endif %}
         
         <form method="POST">
             <div class="form-group">
@@ -1026,13 +1500,9 @@ class DistributedLAMServer:
 </html>
         '''
     
-    def _get_r1_template(self, success=None, error=None, response=None, task_id=None):
+    def _get_r1_template(self):
         """Get R1-friendly interface template with real-time status updates"""
-        success_html = f"<div class='success'>{success}</div>" if success else ""
-        error_html = f"<div class='error'>{error}</div>" if error else ""
-        response_html = f"<div class='response'><strong>Response:</strong> {response}</div>" if response else ""
-        
-        return f'''
+        return '''
 <!DOCTYPE html>
 <html>
 <head>
@@ -1040,28 +1510,28 @@ class DistributedLAMServer:
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <style>
-        body {{ font-family: Arial, sans-serif; margin: 20px; background: #f0f0f0; }}
-        .container {{ max-width: 700px; margin: 0 auto; background: white; padding: 25px; border-radius: 10px; }}
-        h1 {{ color: #ff6600; text-align: center; margin-bottom: 20px; }}
-        .form-group {{ margin: 15px 0; }}
-        label {{ display: block; margin-bottom: 5px; font-weight: bold; }}
-        input[type="text"] {{ width: 100%; padding: 15px; font-size: 16px; border: 2px solid #ddd; border-radius: 5px; box-sizing: border-box; }}
-        button {{ width: 100%; padding: 15px; font-size: 16px; background: #ff6600; color: white; border: none; border-radius: 5px; cursor: pointer; }}
-        button:hover {{ background: #e55a00; }}
-        .success {{ background: #d4edda; color: #155724; padding: 12px; border-radius: 5px; margin: 10px 0; }}
-        .error {{ background: #f8d7da; color: #721c24; padding: 12px; border-radius: 5px; margin: 10px 0; }}
-        .response {{ background: #e7f3ff; color: #004085; padding: 12px; border-radius: 5px; margin: 10px 0; }}
-        .instructions {{ background: #f8f9fa; padding: 15px; border-radius: 5px; margin: 15px 0; }}
-        .status-section {{ margin: 20px 0; padding: 15px; background: #f8f9fa; border-radius: 5px; }}
-        .status-item {{ margin: 10px 0; padding: 10px; border-radius: 5px; }}
-        .status-pending {{ background: #fff3cd; border-left: 4px solid #ffc107; }}
-        .status-completed {{ background: #d1ecf1; border-left: 4px solid #17a2b8; }}
-        .status-success {{ background: #d4edda; border-left: 4px solid #28a745; }}
-        .status-failed {{ background: #f8d7da; border-left: 4px solid #dc3545; }}
-        .worker-info {{ font-size: 0.9em; color: #666; margin-top: 5px; }}
-        .output-box {{ background: #f8f9fa; padding: 10px; border-radius: 3px; margin-top: 8px; font-family: monospace; font-size: 0.9em; }}
-        .refresh-btn {{ background: #6c757d; margin-top: 10px; padding: 8px 15px; font-size: 14px; }}
-        .logout-link {{ float: right; margin-top: 10px; color: #dc3545; text-decoration: none; }}
+        body { font-family: Arial, sans-serif; margin: 20px; background: #f0f0f0; }
+        .container { max-width: 700px; margin: 0 auto; background: white; padding: 25px; border-radius: 10px; }
+        h1 { color: #ff6600; text-align: center; margin-bottom: 20px; }
+        .form-group { margin: 15px 0; }
+        label { display: block; margin-bottom: 5px; font-weight: bold; }
+        input[type="text"] { width: 100%; padding: 15px; font-size: 16px; border: 2px solid #ddd; border-radius: 5px; box-sizing: border-box; }
+        button { width: 100%; padding: 15px; font-size: 16px; background: #ff6600; color: white; border: none; border-radius: 5px; cursor: pointer; }
+        button:hover { background: #e55a00; }
+        .success { background: #d4edda; color: #155724; padding: 12px; border-radius: 5px; margin: 10px 0; }
+        .error { background: #f8d7da; color: #721c24; padding: 12px; border-radius: 5px; margin: 10px 0; }
+        .response { background: #e7f3ff; color: #004085; padding: 12px; border-radius: 5px; margin: 10px 0; }
+        .instructions { background: #f8f9fa; padding: 15px; border-radius: 5px; margin: 15px 0; }
+        .status-section { margin: 20px 0; padding: 15px; background: #f8f9fa; border-radius: 5px; }
+        .status-item { margin: 10px 0; padding: 10px; border-radius: 5px; }
+        .status-pending { background: #fff3cd; border-left: 4px solid #ffc107; }
+        .status-completed { background: #d1ecf1; border-left: 4px solid #17a2b8; }
+        .status-success { background: #d4edda; border-left: 4px solid #28a745; }
+        .status-failed { background: #f8d7da; border-left: 4px solid #dc3545; }
+        .worker-info { font-size: 0.9em; color: #666; margin-top: 5px; }
+        .output-box { background: #f8f9fa; padding: 10px; border-radius: 3px; margin-top: 8px; font-family: monospace; font-size: 0.9em; }
+        .refresh-btn { background: #6c757d; margin-top: 10px; padding: 8px 15px; font-size: 14px; }
+        .logout-link { float: right; margin-top: 10px; color: #dc3545; text-decoration: none; }
     </style>
 </head>
 <body>
@@ -1079,9 +1549,9 @@ class DistributedLAMServer:
             </ol>
         </div>
         
-        {success_html}
-        {error_html}
-        {response_html}
+        {% if success %}<div class='success'>{{ success }}</div>{% endif %}
+        {% if error %}<div class='error'>{{ error }}</div>{% endif %}
+        {% if response %}<div class='response'><strong>Response:</strong> {{ response }}</div>{% endif %}
         
         <form method="POST" id="commandForm">
             <div class="form-group">
@@ -1099,7 +1569,7 @@ class DistributedLAMServer:
         <div class="status-section">
             <h3>Task Status</h3>
             <div id="taskStatus">
-                {"<div class='status-pending'>Current Task: Processing...</div>" if task_id else "<div>No active tasks</div>"}
+                {% if task_id %}<div class='status-pending'>Current Task: Processing...</div>{% else %}<div>No active tasks</div>{% endif %}
             </div>
             <button type="button" class="refresh-btn" onclick="refreshStatus()">Refresh Status</button>
         </div>
@@ -1122,84 +1592,84 @@ class DistributedLAMServer:
     </div>
     
     <script>
-        let currentTaskId = "{task_id or ''}";
+        let currentTaskId = "{{ task_id or '' }}";
         let statusCheckInterval;
         
         // Auto-refresh status every 3 seconds if there's an active task
-        if (currentTaskId) {{
+        if (currentTaskId) {
             statusCheckInterval = setInterval(checkTaskStatus, 3000);
             checkTaskStatus(); // Check immediately
-        }}
+        }
         
-        function checkTaskStatus() {{
+        function checkTaskStatus() {
             if (!currentTaskId) return;
             
-            fetch(`/api/task/${{currentTaskId}}/status`)
+            fetch(`/api/task/${currentTaskId}/status`)
                 .then(response => response.json())
-                .then(data => {{
+                .then(data => {
                     updateTaskStatus(data);
-                    if (data.status === 'completed') {{
+                    if (data.status === 'completed') {
                         clearInterval(statusCheckInterval);
                         currentTaskId = '';
-                    }}
-                }})
-                .catch(error => {{
+                    }
+                })
+                .catch(error => {
                     console.error('Status check failed:', error);
-                }});
-        }}
+                });
+        }
         
-        function updateTaskStatus(data) {{
+        function updateTaskStatus(data) {
             const statusDiv = document.getElementById('taskStatus');
             let statusClass = 'status-pending';
             let statusText = 'Processing...';
             
-            if (data.status === 'completed') {{
+            if (data.status === 'completed') {
                 statusClass = data.success ? 'status-success' : 'status-failed';
                 statusText = data.success ? 'Completed Successfully' : 'Failed';
-            }}
+            }
             
             statusDiv.innerHTML = `
-                <div class="${{statusClass}}">
-                    <strong>Task Status:</strong> ${{statusText}}<br>
-                    <strong>Task ID:</strong> ${{data.id}}<br>
-                    ${{data.worker_id ? `<div class="worker-info">Processed by: ${{data.worker_id}}</div>` : ''}}
-                    ${{data.message ? `<div class="worker-info">Message: ${{data.message}}</div>` : ''}}
-                    ${{data.output ? `<div class="output-box">Output:<br>${{data.output}}</div>` : ''}}
+                <div class="${statusClass}">
+                    <strong>Task Status:</strong> ${statusText}<br>
+                    <strong>Task ID:</strong> ${data.id}<br>
+                    ${data.worker_id ? `<div class="worker-info">Processed by: ${data.worker_id}</div>` : ''}
+                    ${data.message ? `<div class="worker-info">Message: ${data.message}</div>` : ''}
+                    ${data.output ? `<div class="output-box">Output:<br>${data.output}</div>` : ''}
                 </div>
             `;
-        }}
+        }
         
-        function refreshStatus() {{
+        function refreshStatus() {
             // Refresh worker status
             fetch('/api/workers')
                 .then(response => response.json())
-                .then(data => {{
+                .then(data => {
                     const workerDiv = document.getElementById('workerStatus');
-                    if (data.workers && data.workers.length > 0) {{
+                    if (data.workers && data.workers.length > 0) {
                         workerDiv.innerHTML = data.workers.map(worker => `
-                            <div class="status-item status-${{worker.status === 'online' ? 'success' : 'failed'}}">
-                                <strong>${{worker.custom_name || worker.worker_id}}</strong> (${{worker.worker_type}})<br>
-                                <span class="worker-info">Status: ${{worker.status}} | Tasks: ${{worker.current_tasks}}</span>
-                                ${{worker.location ? `<br><span class="worker-info">Location: ${{worker.location}}</span>` : ''}}
+                            <div class="status-item status-${worker.status === 'online' ? 'success' : 'failed'}">
+                                <strong>${worker.custom_name || worker.worker_id}</strong> (${worker.worker_type})<br>
+                                <span class="worker-info">Status: ${worker.status} | Tasks: ${worker.current_tasks}</span>
+                                ${worker.location ? `<br><span class="worker-info">Location: ${worker.location}</span>` : ''}
                             </div>
                         `).join('');
-                    }} else {{
+                    } else {
                         workerDiv.innerHTML = '<div class="status-failed">No workers connected</div>';
-                    }}
-                }})
-                .catch(error => {{
+                    }
+                })
+                .catch(error => {
                     document.getElementById('workerStatus').innerHTML = '<div class="status-failed">Failed to load worker status</div>';
-                }});
-        }}
+                });
+        }
         
         // Refresh worker status on page load
         refreshStatus();
         
         // Form submission handling
-        document.getElementById('commandForm').addEventListener('submit', function(e) {{
+        document.getElementById('commandForm').addEventListener('submit', function(e) {
             document.getElementById('submitBtn').textContent = 'Processing...';
             document.getElementById('submitBtn').disabled = true;
-        }});
+        });
     </script>
 </body>
 </html>
@@ -1207,9 +1677,6 @@ class DistributedLAMServer:
     
     def run(self, debug=False):
         """Start the distributed server"""
-        # Set permanent session lifetime (7 days for R1)
-        self.app.permanent_session_lifetime = 7 * 24 * 60 * 60  # 7 days in seconds
-        
         logging.info(f"Starting LAMControl Distributed Server on {self.host}:{self.port}")
         print(f"\n=== LAMControl Distributed Server ===")
         print(f"Server running on: http://{self.host}:{self.port}")
@@ -1217,7 +1684,20 @@ class DistributedLAMServer:
         print(f"R1 Login Page: http://{self.host}:{self.port}/r1/login")
         print(f"=====================================\n")
         
-        self.socketio.run(self.app, host=self.host, port=self.port, debug=debug, allow_unsafe_werkzeug=True)
+        if self.socketio.async_mode == 'threading':
+            # Werkzeug dev server, only used when eventlet is not installed
+            self.socketio.run(self.app, host=self.host, port=self.port, debug=debug, allow_unsafe_werkzeug=True)
+        else:
+            self.socketio.run(self.app, host=self.host, port=self.port, debug=debug)
+
+
+def create_app(redis_url=None):
+    """Application factory for production WSGI servers.
+    
+    Example: gunicorn -k eventlet -w 1 'distributed_server:create_app()'
+    """
+    server = DistributedLAMServer(async_mode='eventlet', message_queue=redis_url)
+    return server.app
 
 
 def main():
@@ -1228,6 +1708,8 @@ def main():
     parser.add_argument('--host', default='0.0.0.0', help='Host to bind to (default: 0.0.0.0)')
     parser.add_argument('--port', type=int, default=5000, help='Port to bind to (default: 5000)')
     parser.add_argument('--debug', action='store_true', help='Enable debug mode')
+    parser.add_argument('--redis-url', default=None,
+                        help='Redis/KeyDB URL used as the Socket.IO message queue when running several servers')
     
     args = parser.parse_args()
     
@@ -1237,8 +1719,14 @@ def main():
         format='%(asctime)s - %(levelname)s - %(message)s'
     )
     
+    # The stdlib was patched at the top of this file when run as a script
+    async_mode = 'eventlet' if _EVENTLET_PATCHED else 'threading'
+    if not _EVENTLET_PATCHED:
+        logging.warning("eventlet not installed or not patched at startup, falling back to the threaded Werkzeug server")
+    
     # Create and run server
-    server = DistributedLAMServer(host=args.host, port=args.port)
+    server = DistributedLAMServer(host=args.host, port=args.port, async_mode=async_mode,
+                                  message_queue=args.redis_url)
     server.run(debug=args.debug)
 
 
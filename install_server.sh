@@ -319,7 +319,6 @@ password_hash = hashlib.sha256(password.encode()).hexdigest()
 
 creds = {
     'username': username,
-    'password': password,
     'password_hash': password_hash,
     'created_at': datetime.now(timezone.utc).isoformat()
 }
@@ -330,6 +329,7 @@ with open('cache/admin_creds.json', 'w') as f:
 print(f'Admin credentials created:')
 print(f'Username: {username}')
 print(f'Password: {password}')
+print(f'Only its hash is stored, so save the password now!')
 "
         print_success "Admin user created"
     else
@@ -373,7 +373,7 @@ import json
 with open('$INSTALL_DIR/cache/admin_creds.json') as f:
     creds = json.load(f)
 print(f\"  Username: {creds['username']}\")
-print(f\"  Password: {creds['password']}\")
+print(f\"  Password: {creds.get('password', '[printed when the admin user was created]')}\")
 "
     fi
     echo
@@ -240,25 +240,23 @@ install_worker() {
         git clone https://github.com/AidanTheBandit/LAMControl.git .
     fi
     
-    # Install Python dependencies
-    print_status "Installing Python dependencies..."
-    $PYTHON_CMD -m pip install --user -r requirements_distributed.txt
-    
+    # Python dependencies are installed together with the integration packages
     print_success "LAMControl worker installed"
 }
 
 install_integration_dependencies() {
     print_status "Installing integration-specific dependencies..."
     
-    # Parse integrations and install dependencies
+    # Collect every integration's packages, then run pip once for all of them
     IFS=',' read -ra INTEGRATION_ARRAY <<< "$INTEGRATIONS"
+    EXTRA_PACKAGES=()
     
     for integration_spec in "${INTEGRATION_ARRAY[@]}"; do
         # Parse integration name (ignore features for dependency installation)
         IFS=':' read -ra SPEC_PARTS <<< "$integration_spec"
         INTEGRATION_NAME="${SPEC_PARTS[0]}"
         
-        print_status "Installing dependencies for $INTEGRATION_NAME integration..."
+        print_status "Collecting dependencies for $INTEGRATION_NAME integration..."
         
         case $INTEGRATION_NAME in
             browser)
@@ -268,12 +266,10 @@ install_integration_dependencies() {
                 print_status "Computer integration - no additional dependencies needed"
                 ;;
             messaging)
-                print_status "Installing messaging dependencies..."
-                $PYTHON_CMD -m pip install --user playwright python-telegram-bot
+                EXTRA_PACKAGES+=(playwright python-telegram-bot)
                 ;;
             ai)
-                print_status "Installing AI dependencies..."
-                $PYTHON_CMD -m pip install --user open-interpreter
+                EXTRA_PACKAGES+=(open-interpreter)
                 ;;
             *)
                 print_warning "Unknown integration: $INTEGRATION_NAME"
@@ -281,6 +277,30 @@ install_integration_dependencies() {
         esac
     done
     
+    if [ ${#EXTRA_PACKAGES[@]} -gt 0 ]; then
+        # Drop duplicates and anything already installed, so pip only resolves what is missing
+        mapfile -t EXTRA_PACKAGES < <(printf '%s\n' "${EXTRA_PACKAGES[@]}" | sort -u | $PYTHON_CMD -c "
+import re
+import sys
+from importlib.metadata import distributions
+
+normalize = lambda name: re.sub(r'[-_.]+', '-', name).lower()
+installed = {normalize(dist.metadata['Name']) for dist in distributions() if dist.metadata['Name']}
+for line in sys.stdin:
+    package = line.strip()
+    if package and normalize(re.split(r'[<>=!~\[; ]', package, 1)[0]) not in installed:
+        print(package)
+")
+    fi
+    
+    # One pip run so the resolver solves the core requirements and integration packages together
+    print_status "Installing Python dependencies..."
+    if [ ${#EXTRA_PACKAGES[@]} -gt 0 ]; then
+        print_status "Integration packages: ${EXTRA_PACKAGES[*]}"
+    fi
+    $PYTHON_CMD -m pip install --user --no-input --disable-pip-version-check \
+        -r requirements_distributed.txt "${EXTRA_PACKAGES[@]}"
+    
     print_success "Integration dependencies installed"
 }
 
@@ -381,51 +401,52 @@ export PYTHONPATH="$INSTALL_DIR:\$PYTHONPATH"
 $PYTHON_CMD -c "
 import sys
 sys.path.insert(0, '.')
-from integrated_worker_node import IntegratedWorkerNode, auto_discover_integrations
+from integrated_worker_node import IntegratedWorkerNode, auto_discover_integrations, load_worker_config, setup_logging
 from integrations import IntegrationRegistry
-import json
 import logging
 
-# Setup logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
-
-# Load configuration
-with open('worker_config.json') as f:
-    config = json.load(f)
-
-worker_config = config['worker']
-server_config = config['server']
-integrations_config = config['integrations']
-
-# Create worker
-worker = IntegratedWorkerNode(
-    server_endpoint=server_config['endpoint'],
-    worker_port=worker_config['port'],
-    worker_name=worker_config['name'],
-    location=worker_config['location'],
-    description=worker_config['description']
-)
-
-# Load integrations through auto-discovery
-print('Loading integrations...')
-worker.auto_discover_and_load_integrations(integrations_config)
-
-print(f'Worker configured with {len(worker.capabilities)} capabilities:')
-for cap in worker.capabilities:
-    print(f'  - {cap}')
-
-# Register with server
-if worker.register_with_server():
-    print('Successfully registered with server')
-else:
-    print('Failed to register with server - continuing anyway')
-
-# Start heartbeat
-worker.start_heartbeat()
-
-# Start worker
-print(f'Starting worker on port {worker_config[\"port\"]}...')
-worker.app.run(host='0.0.0.0', port=worker_config['port'], debug=False)
+# Setup logging; the listener flushes queued records when stopped
+log_listener = setup_logging()
+
+try:
+    # Load configuration
+    config = load_worker_config('worker_config.json')
+
+    worker_config = config['worker']
+    server_config = config['server']
+    integrations_config = config['integrations']
+
+    # Create worker
+    worker = IntegratedWorkerNode(
+        server_endpoint=server_config['endpoint'],
+        worker_port=worker_config['port'],
+        worker_name=worker_config['name'],
+        location=worker_config['location'],
+        description=worker_config['description']
+    )
+
+    # Load integrations through auto-discovery
+    print('Loading integrations...')
+    worker.auto_discover_and_load_integrations(integrations_config)
+
+    print(f'Worker configured with {len(worker.capabilities)} capabilities:')
+    for cap in worker.capabilities:
+        print(f'  - {cap}')
+
+    # Register with server
+    if worker.register_with_server():
+        print('Successfully registered with server')
+    else:
+        print('Failed to register with server - continuing anyway')
+
+    # Start heartbeat
+    worker.start_heartbeat()
+
+    # Start worker
+    print(f'Starting worker on port {worker_config[\"port\"]}...')
+    worker.serve()
+finally:
+    log_listener.stop()
 "
 EOF
     chmod +x start_worker.sh
@@ -6,19 +6,25 @@ instead of fixed worker types.
 """
 
 import os
-import json
+import hmac
 import logging
+import logging.handlers
+import queue
 import secrets
+import itertools
 import threading
+from concurrent.futures import ThreadPoolExecutor
 import time
-import requests
+from collections import deque
 from datetime import datetime, timezone
 from typing import Dict, List, Optional, Any, Callable
-from flask import Flask, request, jsonify
 from abc import ABC, abstractmethod
 
+import orjson
+
 # Import the integration system
-from integrations import Integration, IntegrationConfig, IntegrationRegistry, auto_discover_integrations
+from integrations import (Integration, IntegrationConfig, IntegrationRegistry, auto_discover_integrations,
+                          get_integration_class, load_integration_index)
 
 
 class IntegratedWorkerNode:
@@ -33,8 +39,10 @@ class IntegratedWorkerNode:
         self.server_endpoint = server_endpoint
         self.worker_port = worker_port
         self.api_key = secrets.token_hex(16)
+        self._api_key_bytes = self.api_key.encode()
         
-        # Flask app for receiving tasks
+        # Flask app for receiving tasks (imported here so config-only paths skip Flask)
+        from flask import Flask
         self.app = Flask(f"LAMWorker_{self.worker_id}")
         self.setup_routes()
         
@@ -42,55 +50,72 @@ class IntegratedWorkerNode:
         self.status = "starting"
         self.current_tasks = 0
         self.max_concurrent_tasks = 5
-        self.task_history = []
+        self._task_slots = threading.BoundedSemaphore(self.max_concurrent_tasks)
+        self._task_count_lock = threading.Lock()  # current_tasks is for reporting only
+        self._task_pool = ThreadPoolExecutor(max_workers=self.max_concurrent_tasks, thread_name_prefix='lamtask')
+        self.task_history = deque(maxlen=256)  # Only recent tasks are ever reported
+        self._task_ids = itertools.count(1)  # next() is atomic under the GIL
         
         # Integration system
         self.registry = IntegrationRegistry()
-        self.capabilities = []
+        self.capabilities = ()
+        self._handler_table: Dict[str, Callable] = {}  # capability -> handler, filled at registration
+        self._refresh_static_info()
+        
+        # Second-resolution UTC timestamp reused by status responses within the same second
+        self._clock_second = 0
+        self._clock_iso = ""
+        
+        # Pooled HTTP session for registration and heartbeats, created on first use
+        self._http = None
+        
+        # Set on shutdown; wakes the heartbeat thread immediately
+        self._stop = threading.Event()
+        self._heartbeat_thread = None
         
         logging.info(f"Initialized integrated worker: {self.worker_id}")
     
     def load_integrations_from_config(self, integrations_config: Dict[str, Any]):
         """Load integrations based on configuration"""
         try:
+            to_register = []
             for integration_name, integration_config in integrations_config.items():
                 if not integration_config.get('enabled', True):
-                    self.logger.info(f"Integration {integration_name} is disabled")
+                    logging.info(f"Integration {integration_name} is disabled")
                     continue
                 
                 # Create integration config
                 config = IntegrationConfig(
                     name=integration_name,
                     enabled=integration_config.get('enabled', True),
-                    settings=integration_config.get('settings', {}),
-                    dependencies=integration_config.get('dependencies', [])
+                    settings=integration_config.get('settings') or {},
+                    dependencies=integration_config.get('dependencies') or []
                 )
                 
                 # Try to load the integration
                 try:
-                    module_name = f'integrations.{integration_name}'
-                    module = __import__(module_name, fromlist=[integration_name])
-                    
-                    # Look for integration class
-                    class_name = f"{integration_name.title()}Integration"
-                    if hasattr(module, class_name):
-                        integration_class = getattr(module, class_name)
-                        integration = integration_class(config)
-                        
-                        if self.registry.register_integration(integration):
-                            logging.info(f"Loaded integration: {integration_name}")
-                        else:
-                            logging.warning(f"Failed to register integration: {integration_name}")
+                    integration_class = get_integration_class(integration_name)
+                    if integration_class:
+                        to_register.append(integration_class(config))
                     else:
-                        logging.warning(f"Integration class {class_name} not found in {module_name}")
+                        logging.warning(f"No integration class found for {integration_name}")
                         
                 except ImportError as e:
                     logging.error(f"Failed to import integration {integration_name}: {e}")
                 except Exception as e:
                     logging.error(f"Error loading integration {integration_name}: {e}")
             
+            # Independent integrations initialize concurrently, then register in config order
+            for integration, registered in zip(to_register, self.registry.register_integrations(to_register)):
+                if registered:
+                    self._index_handlers(integration)
+                    logging.info(f"Loaded integration: {integration.name}")
+                else:
+                    logging.warning(f"Failed to register integration: {integration.name}")
+            
             # Update capabilities
             self.capabilities = self.registry.get_all_capabilities()
+            self._refresh_static_info()
             logging.info(f"Worker loaded {len(self.registry.integrations)} integrations with {len(self.capabilities)} capabilities")
             
         except Exception as e:
@@ -99,47 +124,92 @@ class IntegratedWorkerNode:
     def auto_discover_and_load_integrations(self, integrations_config: Dict[str, Any] = None):
         """Auto-discover and load all available integrations"""
         try:
-            discovered = auto_discover_integrations()
+            # Disabled integrations are skipped before discovery constructs them
+            disabled = [
+                name for name, int_config in (integrations_config or {}).items()
+                if not int_config.get('enabled', True)
+            ]
+            for name in disabled:
+                logging.info(f"Integration {name} is disabled in config")
+            
+            discovered = auto_discover_integrations(exclude=disabled)
             
             for integration in discovered:
                 # Check if we have specific config for this integration
                 if integrations_config and integration.name in integrations_config:
-                    int_config = integrations_config[integration.name]
-                    if not int_config.get('enabled', True):
-                        logging.info(f"Integration {integration.name} is disabled in config")
-                        continue
-                    
                     # Update integration settings from config
-                    integration.settings.update(int_config.get('settings', {}))
-                
-                if self.registry.register_integration(integration):
+                    integration.settings.update(integrations_config[integration.name].get('settings', {}))
+            
+            for integration, registered in zip(discovered, self.registry.register_integrations(discovered)):
+                if registered:
+                    self._index_handlers(integration)
                     logging.info(f"Auto-loaded integration: {integration.name}")
                 else:
                     logging.warning(f"Failed to auto-load integration: {integration.name}")
             
             # Update capabilities
             self.capabilities = self.registry.get_all_capabilities()
+            self._refresh_static_info()
             logging.info(f"Worker auto-loaded {len(self.registry.integrations)} integrations with {len(self.capabilities)} capabilities")
             
         except Exception as e:
             logging.error(f"Error auto-discovering integrations: {e}")
     
+    def _refresh_static_info(self):
+        """Rebuild the response fields that only change when integrations are loaded"""
+        self._capabilities_lc = frozenset(capability.lower() for capability in self.capabilities)
+        self._static_info = {
+            'worker_id': self.worker_id,
+            'worker_name': self.worker_name,
+            'capabilities': self.capabilities,
+            'integrations': list(self.registry.integrations.keys()),
+            'location': self.location,
+            'description': self.description
+        }
+        self._integrations_info = {
+            name: {
+                'name': integration.name,
+                'enabled': integration.is_enabled(),
+                'capabilities': integration.get_capabilities(),
+                'dependencies': integration.get_dependencies()
+            }
+            for name, integration in self.registry.integrations.items()
+        }
+    
+    def _now_iso(self) -> str:
+        """Current UTC time as an ISO string, formatted at most once per second"""
+        second = int(time.time())
+        if second != self._clock_second:
+            self._clock_iso = datetime.fromtimestamp(second, timezone.utc).isoformat()
+            self._clock_second = second
+        return self._clock_iso
+    
+    def _index_handlers(self, integration: Integration):
+        """Add a newly registered integration's handlers to the dispatch table"""
+        handlers = integration.get_handlers()
+        for capability in integration.get_capabilities():
+            # Later registrations win, matching the registry's capability map
+            handler = handlers.get(capability)
+            if handler:
+                self._handler_table[capability.lower()] = handler
+            else:
+                self._handler_table.pop(capability.lower(), None)
+    
     def setup_routes(self):
         """Setup Flask routes for the worker"""
+        from flask import request, Response
+        
+        def _json(obj, status: int = 200) -> Response:
+            """jsonify() replacement that serializes with orjson"""
+            return Response(orjson.dumps(obj), status=status, mimetype='application/json')
         
         @self.app.route('/health', methods=['GET'])
         def health_check():
-            return jsonify({
-                'status': 'healthy',
-                'worker_id': self.worker_id,
-                'worker_name': self.worker_name,
-                'capabilities': self.capabilities,
-                'integrations': list(self.registry.integrations.keys()),
-                'current_tasks': self.current_tasks,
-                'location': self.location,
-                'description': self.description,
-                'timestamp': datetime.now(timezone.utc).isoformat()
-            })
+            payload = self._static_info.copy()
+            payload['status'] = 'healthy'
+            payload['current_tasks'] = self.current_tasks
+            payload['timestamp'] = self._now_iso()
+            return _json(payload)
         
         @self.app.route('/execute', methods=['POST'])
         def execute_task():
@@ -148,53 +218,34 @@ class IntegratedWorkerNode:
                 # Verify authorization
                 auth_header = request.headers.get('Authorization')
                 if not auth_header or not auth_header.startswith('Bearer '):
-                    return jsonify({'error': 'Invalid authorization'}), 401
+                    return _json({'error': 'Invalid authorization'}), 401
                 
-                token = auth_header.split(' ')[1]
-                if token != self.api_key:
-                    return jsonify({'error': 'Invalid API key'}), 401
-                
-                # Check task capacity
-                if self.current_tasks >= self.max_concurrent_tasks:
-                    return jsonify({'error': 'Worker at capacity'}), 503
+                # Constant-time compare; str.removeprefix needs Python 3.9
+                token = auth_header[len('Bearer '):].encode()
+                if not hmac.compare_digest(token, self._api_key_bytes):
+                    return _json({'error': 'Invalid API key'}), 401
                 
                 data = request.get_json()
                 if not data or 'task' not in data:
-                    return jsonify({'error': 'No task provided'}), 400
+                    return _json({'error': 'No task provided'}), 400
+                
+                # Claim a task slot; the check and the claim are one atomic step
+                if not self._task_slots.acquire(blocking=False):
+                    return _json({'error': 'Worker at capacity'}), 503
                 
                 task = data['task']
-                task_id = secrets.token_hex(8)
+                task_id = f"{self.worker_id}-{next(self._task_ids):x}"
                 
                 logging.info(f"Received task: {task}")
                 
-                # Execute task in background thread
-                def execute_task_thread():
-                    self.current_tasks += 1
-                    try:
-                        result = self._execute_task(task)
-                        self.task_history.append({
-                            'task_id': task_id,
-                            'task': task,
-                            'result': result,
-                            'timestamp': datetime.now(timezone.utc).isoformat(),
-                            'status': 'completed'
-                        })
-                    except Exception as e:
-                        logging.error(f"Task execution error: {e}")
-                        self.task_history.append({
-                            'task_id': task_id,
-                            'task': task,
-                            'result': f"Error: {str(e)}",
-                            'timestamp': datetime.now(timezone.utc).isoformat(),
-                            'status': 'failed'
-                        })
-                    finally:
-                        self.current_tasks -= 1
-                
-                thread = threading.Thread(target=execute_task_thread)
-                thread.start()
+                # Execute task on the worker's thread pool
+                try:
+                    self._task_pool.submit(self._run_task, task_id, task)
+                except Exception:
+                    self._task_slots.release()
+                    raise
                 
-                return jsonify({
+                return _json({
                     'status': 'accepted',
                     'task_id': task_id,
                     'message': 'Task queued for execution'
@@ -202,55 +253,63 @@ class IntegratedWorkerNode:
                 
             except Exception as e:
                 logging.error(f"Error in execute endpoint: {e}")
-                return jsonify({'error': str(e)}), 500
+                return _json({'error': str(e)}), 500
         
         @self.app.route('/status', methods=['GET'])
         def get_status():
-            return jsonify({
-                'worker_id': self.worker_id,
-                'worker_name': self.worker_name,
-                'status': self.status,
-                'current_tasks': self.current_tasks,
-                'max_concurrent_tasks': self.max_concurrent_tasks,
-                'capabilities': self.capabilities,
-                'integrations': list(self.registry.integrations.keys()),
-                'task_history': self.task_history[-10:],  # Last 10 tasks
-                'location': self.location,
-                'description': self.description
-            })
+            payload = self._static_info.copy()
+            payload['status'] = self.status
+            payload['current_tasks'] = self.current_tasks
+            payload['max_concurrent_tasks'] = self.max_concurrent_tasks
+            payload['task_history'] = list(self.task_history)[-10:]  # Last 10 tasks
+            return _json(payload)
         
         @self.app.route('/integrations', methods=['GET'])
         def get_integrations():
             """Get information about loaded integrations"""
-            integration_info = {}
-            for name, integration in self.registry.integrations.items():
-                integration_info[name] = {
-                    'name': integration.name,
-                    'enabled': integration.is_enabled(),
-                    'capabilities': integration.get_capabilities(),
-                    'dependencies': integration.get_dependencies()
-                }
-            return jsonify(integration_info)
+            return _json(self._integrations_info)
+    
+    def _run_task(self, task_id: str, task: str):
+        """Run an accepted task, record it in the history and free its slot"""
+        with self._task_count_lock:
+            self.current_tasks += 1
+        try:
+            result = self._execute_task(task)
+            self.task_history.append({
+                'task_id': task_id,
+                'task': task,
+                'result': result,
+                'timestamp': datetime.now(timezone.utc).isoformat(),
+                'status': 'completed'
+            })
+        except Exception as e:
+            logging.error(f"Task execution error: {e}")
+            self.task_history.append({
+                'task_id': task_id,
+                'task': task,
+                'result': f"Error: {str(e)}",
+                'timestamp': datetime.now(timezone.utc).isoformat(),
+                'status': 'failed'
+            })
+        finally:
+            with self._task_count_lock:
+                self.current_tasks -= 1
+            self._task_slots.release()
     
     def _execute_task(self, task: str) -> str:
         """Execute a task using the appropriate integration"""
         try:
-            # Parse the task to identify the capability
-            parts = task.split()
-            if len(parts) < 1:
+            # The first word of the task names the capability; split at most once
+            head = task.split(None, 1)
+            if not head:
                 return "Empty task"
             
-            capability = parts[0].lower()
-            
-            # Find the integration that handles this capability
-            integration = self.registry.get_integration_for_capability(capability)
-            if not integration:
-                return f"No integration found for capability: {capability}"
+            capability = head[0].lower()
             
-            # Get the handler for this capability
-            handlers = integration.get_handlers()
-            handler = handlers.get(capability)
+            handler = self._handler_table.get(capability)
             if not handler:
+                if capability not in self._capabilities_lc:
+                    return f"No integration found for capability: {capability}"
                 return f"No handler found for capability: {capability}"
             
             # Execute the task
@@ -262,6 +321,21 @@ class IntegratedWorkerNode:
             logging.error(error_msg)
             return error_msg
     
+    def _server_session(self):
+        """Return the keep-alive session used to talk to the central server"""
+        if self._http is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+            
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=2, pool_maxsize=4,
+                                  max_retries=Retry(total=2, backoff_factor=0.5))
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            self._http = session
+        return self._http
+    
     def register_with_server(self) -> bool:
         """Register this worker with the central server"""
         try:
@@ -276,7 +350,7 @@ class IntegratedWorkerNode:
                 'api_key': self.api_key
             }
             
-            response = requests.post(
+            response = self._server_session().post(
                 f"{self.server_endpoint}/api/worker/register",
                 json=payload,
                 timeout=10
@@ -296,12 +370,15 @@ class IntegratedWorkerNode:
     
     def start_heartbeat(self):
         """Start sending heartbeats to the server"""
+        session = self._server_session()
+        heartbeat_url = f"{self.server_endpoint}/api/worker/{self.worker_id}/heartbeat"
+        
         def heartbeat_thread():
-            while self.status != "stopped":
+            while not self._stop.is_set():
                 try:
                     if self.status == "online":
-                        response = requests.post(
-                            f"{self.server_endpoint}/api/worker/{self.worker_id}/heartbeat",
+                        response = session.post(
+                            heartbeat_url,
                             json={'status': self.status, 'current_tasks': self.current_tasks},
                             timeout=5
                         )
@@ -310,10 +387,26 @@ class IntegratedWorkerNode:
                 except Exception as e:
                     logging.warning(f"Heartbeat error: {e}")
                 
-                time.sleep(30)  # Send heartbeat every 30 seconds
+                self._stop.wait(30)  # Send heartbeat every 30 seconds
+        
+        self._heartbeat_thread = threading.Thread(target=heartbeat_thread, daemon=True)
+        self._heartbeat_thread.start()
+    
+    def serve(self, debug=False):
+        """Serve the worker's Flask app, preferring waitress when it is installed"""
+        if not debug:
+            try:
+                from waitress import serve
+            except ImportError:
+                serve = None
+            if serve:
+                serve(self.app, host='0.0.0.0', port=self.worker_port,
+                      threads=max(4, self.max_concurrent_tasks * 2))
+                return
         
-        thread = threading.Thread(target=heartbeat_thread, daemon=True)
-        thread.start()
+        # Werkzeug fallback: threaded so /health isn't queued behind /execute
+        self.app.run(host='0.0.0.0', port=self.worker_port, debug=debug,
+                     threaded=True, use_reloader=False)
     
     def run(self, debug=False):
         """Start the worker node"""
@@ -326,7 +419,7 @@ class IntegratedWorkerNode:
                 self.start_heartbeat()
                 
                 # Start Flask app
-                self.app.run(host='0.0.0.0', port=self.worker_port, debug=debug)
+                self.serve(debug=debug)
             else:
                 logging.error("Failed to register with server, not starting worker")
                 
@@ -337,16 +430,48 @@ class IntegratedWorkerNode:
             logging.error(f"Worker error: {e}")
             self.status = "error"
         finally:
+            # Stop the heartbeat before its session and integrations go away
+            self._stop.set()
+            if self._heartbeat_thread is not None:
+                self._heartbeat_thread.join(timeout=5)
+            
+            self._task_pool.shutdown(wait=False)
+            
             # Cleanup integrations
             self.registry.cleanup_all()
+            if self._http is not None:
+                self._http.close()
 
 
-def create_worker_from_config(config_file: str, server_endpoint: str, worker_port: int = 6000) -> IntegratedWorkerNode:
-    """Create a worker node from a configuration file"""
+def setup_logging(level: int = logging.INFO) -> logging.handlers.QueueListener:
+    """
+    Route log records through a queue so task and request threads never block on output
+    
+    Handlers run on the listener's own thread; call stop() on the returned listener
+    at shutdown to flush what is still queued.
+    """
+    log_queue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+    
+    root = logging.getLogger()
+    root.handlers[:] = [logging.handlers.QueueHandler(log_queue)]
+    root.setLevel(level)
+    
+    listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    listener.start()
+    return listener
+
+
+def load_worker_config(config_file: str) -> Dict[str, Any]:
+    """Load a worker config file"""
+    with open(config_file, 'rb') as f:
+        return orjson.loads(f.read())
+
+
+def create_worker_from_dict(config: Dict[str, Any], server_endpoint: str, worker_port: int = 6000) -> IntegratedWorkerNode:
+    """Create a worker node from an already parsed configuration"""
     try:
-        with open(config_file, 'r') as f:
-            config = json.load(f)
-        
         # Extract worker configuration
         worker_config = config.get('worker', {})
         integrations_config = config.get('integrations', {})
@@ -374,30 +499,49 @@ def create_worker_from_config(config_file: str, server_endpoint: str, worker_por
         raise
 
 
+def create_worker_from_config(config_file: str, server_endpoint: str, worker_port: int = 6000) -> IntegratedWorkerNode:
+    """Create a worker node from a configuration file"""
+    return create_worker_from_dict(load_worker_config(config_file), server_endpoint, worker_port)
+
+
 if __name__ == "__main__":
     import sys
     
-    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
-    
-    if len(sys.argv) < 2:
-        print("Usage: python integrated_worker_node.py <server_endpoint> [port] [config_file]")
-        print("Example: python integrated_worker_node.py http://localhost:5000 6000 worker_config.json")
-        sys.exit(1)
-    
-    server_endpoint = sys.argv[1]
-    worker_port = int(sys.argv[2]) if len(sys.argv) > 2 else 6000
-    config_file = sys.argv[3] if len(sys.argv) > 3 else None
+    log_listener = setup_logging()
     
+    # Every exit, sys.exit included, passes through the finally so queued records get written
     try:
-        if config_file:
-            worker = create_worker_from_config(config_file, server_endpoint, worker_port)
-        else:
-            # Create a default worker with auto-discovery
-            worker = IntegratedWorkerNode(server_endpoint, worker_port)
-            worker.auto_discover_and_load_integrations()
+        if '--list-integrations' in sys.argv:
+            # Served from the on-disk index, which is built from module sources without importing them
+            for name, info in load_integration_index().items():
+                status = info['class_name'] or f"no integration class ({info.get('error', 'helper module')})"
+                print(f"{name}: {status}")
+                if info['capabilities']:
+                    print(f"    capabilities: {', '.join(info['capabilities'])}")
+            sys.exit(0)
         
-        worker.run()
+        if len(sys.argv) < 2:
+            print("Usage: python integrated_worker_node.py <server_endpoint> [port] [config_file]")
+            print("       python integrated_worker_node.py --list-integrations")
+            print("Example: python integrated_worker_node.py http://localhost:5000 6000 worker_config.json")
+            sys.exit(1)
         
-    except Exception as e:
-        logging.error(f"Failed to start worker: {e}")
-        sys.exit(1)
+        server_endpoint = sys.argv[1]
+        worker_port = int(sys.argv[2]) if len(sys.argv) > 2 else 6000
+        config_file = sys.argv[3] if len(sys.argv) > 3 else None
+        
+        try:
+            if config_file:
+                worker = create_worker_from_config(config_file, server_endpoint, worker_port)
+            else:
+                # Create a default worker with auto-discovery
+                worker = IntegratedWorkerNode(server_endpoint, worker_port)
+                worker.auto_discover_and_load_integrations()
+            
+            worker.run()
+            
+        except Exception as e:
+            logging.error(f"Failed to start worker: {e}")
+            sys.exit(1)
+    finally:
+        log_listener.stop()
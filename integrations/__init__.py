@@ -7,11 +7,36 @@ with worker nodes dynamically.
 
 import os
 import sys
+import ast
+import json
+import hashlib
+import tempfile
 import importlib
+import importlib.util
 import logging
+import threading
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional, Any, Callable
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, List, Optional, Any, Callable, Tuple, ClassVar, Iterable, Iterator, Set
+from dataclasses import dataclass, field
+
+
+# Whether each dependency module is importable, probed once per process
+_dependency_available: Dict[str, bool] = {}
+
+
+def _dependency_installed(dep: str) -> bool:
+    """Check that a module can be imported without executing it"""
+    available = _dependency_available.get(dep)
+    if available is None:
+        try:
+            available = importlib.util.find_spec(dep) is not None
+        except (ImportError, ValueError):
+            # find_spec imports parent packages of dotted names, which may be missing
+            available = False
+        _dependency_available[dep] = available
+    return available
 
 
 @dataclass
@@ -19,19 +44,16 @@ class IntegrationConfig:
     """Configuration for an integration"""
     name: str
     enabled: bool = True
-    settings: Dict[str, Any] = None
-    dependencies: List[str] = None
-    
-    def __post_init__(self):
-        if self.settings is None:
-            self.settings = {}
-        if self.dependencies is None:
-            self.dependencies = []
+    settings: Dict[str, Any] = field(default_factory=dict)
+    dependencies: List[str] = field(default_factory=list)
 
 
 class Integration(ABC):
     """Base class for all integrations"""
     
+    # Optional static capability list so discovery can describe a class without constructing it
+    CAPABILITIES: ClassVar[Optional[List[str]]] = None
+    
     def __init__(self, config: IntegrationConfig):
         self.config = config
         self.name = config.name
@@ -70,9 +92,7 @@ class Integration(ABC):
     def validate_dependencies(self) -> bool:
         """Check if all required dependencies are available"""
         for dep in self.get_dependencies():
-            try:
-                importlib.import_module(dep)
-            except ImportError:
+            if not _dependency_installed(dep):
                 self.logger.error(f"Missing dependency: {dep}")
                 return False
         return True
@@ -84,10 +104,12 @@ class IntegrationRegistry:
     def __init__(self):
         self.integrations: Dict[str, Integration] = {}
         self.capability_map: Dict[str, str] = {}  # capability -> integration_name
+        self.integration_capabilities: Dict[str, Set[str]] = {}  # integration_name -> capabilities
         self.logger = logging.getLogger("IntegrationRegistry")
+        self._lock = threading.RLock()  # Guards the maps above
         
-    def register_integration(self, integration: Integration) -> bool:
-        """Register an integration"""
+    def _prepare_integration(self, integration: Integration) -> bool:
+        """Check and initialize an integration; touches no registry state"""
         try:
             if not integration.is_enabled():
                 self.logger.info(f"Integration {integration.name} is disabled, skipping")
@@ -100,14 +122,26 @@ class IntegrationRegistry:
             if not integration.initialize():
                 self.logger.error(f"Integration {integration.name} failed to initialize")
                 return False
-                
-            self.integrations[integration.name] = integration
             
-            # Map capabilities to integration
-            for capability in integration.get_capabilities():
-                if capability in self.capability_map:
-                    self.logger.warning(f"Capability {capability} already registered by {self.capability_map[capability]}")
-                self.capability_map[capability] = integration.name
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"Failed to register integration {integration.name}: {e}")
+            return False
+    
+    def _add_integration(self, integration: Integration) -> bool:
+        """Map an initialized integration and its capabilities"""
+        try:
+            with self._lock:
+                self.integrations[integration.name] = integration
+                
+                # Map capabilities to integration
+                capabilities = integration.get_capabilities()
+                for capability in capabilities:
+                    if capability in self.capability_map:
+                        self.logger.warning(f"Capability {capability} already registered by {self.capability_map[capability]}")
+                    self.capability_map[capability] = integration.name
+                self.integration_capabilities[integration.name] = set(capabilities)
                 
             self.logger.info(f"Registered integration: {integration.name}")
             return True
@@ -116,6 +150,27 @@ class IntegrationRegistry:
             self.logger.error(f"Failed to register integration {integration.name}: {e}")
             return False
     
+    def register_integration(self, integration: Integration) -> bool:
+        """Register an integration"""
+        return self._prepare_integration(integration) and self._add_integration(integration)
+    
+    def register_integrations(self, integrations: List[Integration], max_workers: int = 8) -> List[bool]:
+        """
+        Register several integrations, returning one success flag per integration
+        
+        Dependency checks and initialize() run concurrently since they are
+        independent and often wait on I/O; capabilities are then mapped in input
+        order so conflicts resolve exactly as with sequential registration.
+        """
+        if len(integrations) < 2:
+            prepared = [self._prepare_integration(integration) for integration in integrations]
+        else:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(integrations)),
+                                    thread_name_prefix='lamregister') as pool:
+                prepared = list(pool.map(self._prepare_integration, integrations))
+        
+        return [ok and self._add_integration(integration) for integration, ok in zip(integrations, prepared)]
+    
     def get_integration(self, name: str) -> Optional[Integration]:
         """Get integration by name"""
         return self.integrations.get(name)
@@ -127,9 +182,9 @@ class IntegrationRegistry:
             return self.integrations.get(integration_name)
         return None
     
-    def get_all_capabilities(self) -> List[str]:
+    def get_all_capabilities(self) -> Tuple[str, ...]:
         """Get all available capabilities"""
-        return list(self.capability_map.keys())
+        return tuple(self.capability_map)
     
     def get_enabled_integrations(self) -> List[Integration]:
         """Get all enabled integrations"""
@@ -137,76 +192,409 @@ class IntegrationRegistry:
     
     def unregister_integration(self, name: str):
         """Unregister an integration"""
-        if name in self.integrations:
-            integration = self.integrations[name]
-            integration.cleanup()
+        with self._lock:
+            integration = self.integrations.pop(name, None)
+            if integration is None:
+                return
             
-            # Remove capability mappings
-            capabilities_to_remove = [cap for cap, int_name in self.capability_map.items() if int_name == name]
-            for cap in capabilities_to_remove:
-                del self.capability_map[cap]
-                
-            del self.integrations[name]
-            self.logger.info(f"Unregistered integration: {name}")
+            # Remove capability mappings, leaving any another integration has since taken over
+            for cap in self.integration_capabilities.pop(name, ()):
+                if self.capability_map.get(cap) == name:
+                    del self.capability_map[cap]
+        
+        integration.cleanup()
+        self.logger.info(f"Unregistered integration: {name}")
     
     def cleanup_all(self):
         """Cleanup all integrations"""
-        for integration in self.integrations.values():
+        with self._lock:
+            integrations = list(self.integrations.values())
+            self.integrations.clear()
+            self.capability_map.clear()
+            self.integration_capabilities.clear()
+        
+        for integration in integrations:
             try:
                 integration.cleanup()
             except Exception as e:
                 self.logger.error(f"Error cleaning up {integration.name}: {e}")
+
+
+# Discovery results persisted across runs, valid while the integration sources are unchanged
+INDEX_FILE = os.path.join(os.path.expanduser('~'), '.cache', 'lamcontrol', 'integrations_index.json')
+# Bumped whenever index entries are computed differently, so older index files get rebuilt
+INDEX_VERSION = 2
+
+
+def _integration_module_entries(integrations_dir: str) -> List[os.DirEntry]:
+    """Directory entries of the integration modules in a directory, sorted by name"""
+    with os.scandir(integrations_dir) as it:
+        entries = [
+            entry for entry in it
+            if entry.name.endswith('.py') and not entry.name.startswith('_')
+            and entry.is_file()
+        ]
+    entries.sort(key=lambda entry: entry.name)
+    return entries
+
+
+def _integration_module_files(integrations_dir: str) -> List[str]:
+    """File names of the integration modules in a directory, sorted"""
+    return [entry.name for entry in _integration_module_entries(integrations_dir)]
+
+
+def _integrations_fingerprint(integrations_dir: str) -> str:
+    """Hash of the index version and (name, mtime_ns, size) for every integration module"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"v{INDEX_VERSION};".encode())
+    for entry in _integration_module_entries(integrations_dir):
+        stat = entry.stat()
+        digest.update(f"{entry.name}:{stat.st_mtime_ns}:{stat.st_size};".encode())
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=None)
+def _integration_class_names(module_name: str) -> Tuple[str, ...]:
+    """Class names an integration module may use, in lookup order, without duplicates"""
+    # title() and capitalize() agree for single-word names; fromkeys drops the repeat
+    return tuple(dict.fromkeys((
+        f"{module_name.title()}Integration",
+        f"{module_name.capitalize()}Integration", 
+        f"{module_name.upper()}Integration",
+        f"{module_name}Integration"
+    )))
+
+
+def _find_integration_class(module, module_name: str) -> Optional[type]:
+    """Find the Integration subclass in a module by its naming conventions"""
+    module_dict = vars(module)
+    for class_name in _integration_class_names(module_name):
+        attr = module_dict.get(class_name)
+        if (isinstance(attr, type) and 
+            issubclass(attr, Integration) and 
+            attr is not Integration):
+            return attr
+    return None
+
+
+def _static_capabilities(class_node: ast.ClassDef) -> List[str]:
+    """
+    String literals a class declares as its capabilities: a literal CAPABILITIES list,
+    or list literals and .append('x') calls inside get_capabilities()
+    """
+    capabilities = []
+    for node in class_node.body:
+        if isinstance(node, ast.Assign) and any(
+                isinstance(target, ast.Name) and target.id == 'CAPABILITIES' for target in node.targets):
+            if isinstance(node.value, (ast.List, ast.Tuple)):
+                capabilities.extend(value.value for value in node.value.elts
+                                    if isinstance(value, ast.Constant) and isinstance(value.value, str))
+        elif isinstance(node, ast.FunctionDef) and node.name == 'get_capabilities':
+            for child in ast.walk(node):
+                if (isinstance(child, ast.Call) and isinstance(child.func, ast.Attribute)
+                        and child.func.attr == 'append'):
+                    values = child.args
+                elif isinstance(child, ast.List):
+                    values = child.elts
+                else:
+                    continue
+                for value in values:
+                    if isinstance(value, ast.Constant) and isinstance(value.value, str):
+                        capabilities.append(value.value)
+    return list(dict.fromkeys(capabilities))
+
+
+def _scan_module_metadata(path: str, module_name: str) -> Optional[Dict[str, Any]]:
+    """
+    Describe an integration module from its source without importing it
+    
+    Returns None when the module defines an integration class whose capabilities
+    can't be read statically, so the caller falls back to importing it. Any class
+    named by convention counts, whatever its bases: subclasses of other integrations
+    or of an aliased base are left for the import to judge with issubclass.
+    """
+    try:
+        with open(path, 'rb') as f:
+            tree = ast.parse(f.read(), filename=path)
+    except (OSError, SyntaxError, ValueError):
+        return None
+    
+    metadata = {}
+    class_node = None
+    class_names = _integration_class_names(module_name)
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(
+                isinstance(target, ast.Name) and target.id == 'INTEGRATION_METADATA' for target in node.targets):
+            try:
+                metadata = ast.literal_eval(node.value)
+            except ValueError:
+                return None
+        elif isinstance(node, ast.ClassDef) and node.name in class_names:
+            # Same precedence as _find_integration_class
+            if class_node is None or class_names.index(node.name) < class_names.index(class_node.name):
+                class_node = node
+    
+    capabilities = metadata.get('provides_capabilities')
+    if capabilities is None and class_node is not None:
+        if not any(getattr(base, 'id', getattr(base, 'attr', None)) == 'Integration' for base in class_node.bases):
+            return None  # Capabilities may be inherited; only an import can tell
+        capabilities = _static_capabilities(class_node)
+        if not capabilities:
+            return None
+    
+    return {
+        'class_name': class_node.name if class_node is not None else None,
+        'metadata': metadata,
+        'capabilities': capabilities or []
+    }
+
+
+def _index_module(module_name: str, integrations_dir: str = None) -> Dict[str, Any]:
+    """Describe one integration module for the index, importing it only if its source is not enough"""
+    if integrations_dir is None:
+        integrations_dir = os.path.dirname(__file__)
+    
+    info = _scan_module_metadata(os.path.join(integrations_dir, f"{module_name}.py"), module_name)
+    if info is not None:
+        return info
+    
+    try:
+        module = _import_integration_module(module_name)
+        if module is None:
+            raise ImportError(f"No module named 'integrations.{module_name}'")
+        integration_class = _find_integration_class(module, module_name)
+        metadata = getattr(module, 'INTEGRATION_METADATA', {})
         
-        self.integrations.clear()
-        self.capability_map.clear()
+        capabilities = metadata.get('provides_capabilities')
+        if capabilities is None and integration_class:
+            capabilities = integration_class.CAPABILITIES
+        if capabilities is None and integration_class:
+            # Last resort: construct a default instance just to ask it
+            capabilities = integration_class(IntegrationConfig(name=module_name)).get_capabilities()
+        
+        return {
+            'class_name': integration_class.__name__ if integration_class else None,
+            'metadata': metadata,
+            'capabilities': capabilities or []
+        }
+    except Exception as e:
+        logging.getLogger("IntegrationDiscovery").warning(f"Failed to index integration {module_name}: {e}")
+        # Recorded so the entry is retried on the next run (e.g. after installing a dependency)
+        return {'class_name': None, 'metadata': {}, 'capabilities': [], 'error': str(e)}
+
+
+# Upper bound on threads used to import integration modules concurrently
+DISCOVERY_THREADS = 8
 
 
-def auto_discover_integrations(integrations_dir: str = None) -> List[Integration]:
-    """Auto-discover integrations in the integrations directory"""
+def _map_modules(func: Callable[[str], Any], module_names: List[str]) -> List[Any]:
+    """Apply func to each module name on a small thread pool, keeping input order"""
+    if len(module_names) < 2:
+        return [func(name) for name in module_names]
+    # Imports spend much of their time in file I/O with the GIL released
+    with ThreadPoolExecutor(max_workers=min(DISCOVERY_THREADS, len(module_names)),
+                            thread_name_prefix='lamdiscover') as pool:
+        return list(pool.map(func, module_names))
+
+
+def _import_integration_module(module_name: str):
+    """Return integrations.<module_name>, or None if no such module exists"""
+    full_name = f'integrations.{module_name}'
+    # Already imported: skip the finder/loader chain entirely
+    module = sys.modules.get(full_name)
+    if module is not None:
+        return module
+    
+    if importlib.util.find_spec(full_name) is None:
+        return None
+    return importlib.import_module(full_name)
+
+
+# Integration classes already resolved in this process, keyed by module name
+_integration_classes: Dict[str, Optional[type]] = {}
+
+
+def get_integration_class(module_name: str) -> Optional[type]:
+    """
+    Return the Integration subclass defined in integrations.<module_name>
+    
+    Missing modules are detected with find_spec, without paying for a failed
+    import, and resolved classes are cached so later loads in the same process
+    skip the import machinery. Import errors from the module's own dependencies
+    propagate to the caller.
+    """
+    if module_name in _integration_classes:
+        return _integration_classes[module_name]
+    
+    module = _import_integration_module(module_name)
+    if module is None:
+        return None
+    
+    integration_class = _find_integration_class(module, module_name)
+    _integration_classes[module_name] = integration_class
+    return integration_class
+
+
+def build_integration_index(integrations_dir: str = None) -> Dict[str, Dict[str, Any]]:
+    """Record the class, metadata and capabilities of every integration module"""
+    if integrations_dir is None:
+        integrations_dir = os.path.dirname(__file__)
+    
+    module_names = [file[:-3] for file in _integration_module_files(integrations_dir)]
+    infos = _map_modules(lambda name: _index_module(name, integrations_dir), module_names)
+    return dict(zip(module_names, infos))
+
+
+# Indexes already loaded in this process: (directory, index file) -> (fingerprint, index)
+_loaded_indexes: Dict[Tuple[str, str], Tuple[str, Dict[str, Dict[str, Any]]]] = {}
+
+
+def load_integration_index(integrations_dir: str = None, index_file: str = INDEX_FILE) -> Dict[str, Dict[str, Any]]:
+    """
+    Return the integration index, rebuilding it only when a module file changed
+    
+    A warm run costs a stat per module plus one json.load; a rebuild parses the
+    module sources and only imports those it can't describe statically. Repeat
+    calls in the same process skip the json.load too.
+    """
+    if integrations_dir is None:
+        integrations_dir = os.path.dirname(__file__)
+    
+    fingerprint = _integrations_fingerprint(integrations_dir)
+    memo_key = (os.path.abspath(integrations_dir), index_file)
+    
+    # Indexes with failed entries go back to disk so those modules get retried
+    loaded = _loaded_indexes.get(memo_key)
+    if loaded and loaded[0] == fingerprint and not any(info.get('error') for info in loaded[1].values()):
+        return loaded[1]
+    
+    index = _read_integration_index(memo_key[0], fingerprint, index_file)
+    _loaded_indexes[memo_key] = (fingerprint, index)
+    return index
+
+
+def _read_integration_index(integrations_dir: str, fingerprint: str, index_file: str) -> Dict[str, Dict[str, Any]]:
+    """Load the on-disk index for an absolute directory, rebuilding and rewriting it if it is stale"""
+    cache_key = integrations_dir
+    index = None
+    try:
+        with open(index_file, 'r') as f:
+            cached = json.load(f)
+        if cached.get('dir') == cache_key and cached.get('fingerprint') == fingerprint:
+            index = cached['integrations']
+    except (OSError, ValueError, KeyError):
+        pass
+    
+    if index is not None:
+        # Only modules that failed to import last time are looked at again
+        failed = [name for name, info in index.items() if info.get('error')]
+        if not failed:
+            return index
+        changed = False
+        for name in failed:
+            info = _index_module(name, integrations_dir)
+            changed = changed or info != index[name]
+            index[name] = info
+        if not changed:
+            return index
+    else:
+        index = build_integration_index(integrations_dir)
+    
+    try:
+        os.makedirs(os.path.dirname(index_file), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(index_file), suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump({'dir': cache_key, 'fingerprint': fingerprint, 'integrations': index}, f)
+        os.replace(tmp_path, index_file)
+    except OSError as e:
+        logging.getLogger("IntegrationDiscovery").debug(f"Could not write integration index: {e}")
+    
+    return index
+
+
+def _iter_integration_modules(integrations_dir: str) -> Iterator[Tuple[str, Optional[type], Optional[Exception]]]:
+    """
+    Yield (module_name, integration_class, error) for every module in a directory
+    
+    The one import-based discovery primitive: scandir listing, concurrent imports
+    through the class cache, and class lookup by naming convention. Exactly one
+    of integration_class and error is set unless the module defines no class.
+    
+    Modules whose source defines no class named like an integration (helpers such
+    as discord.py) are never imported.
+    """
+    def resolve(module_name: str):
+        try:
+            # Import the module and look for its integration class
+            return get_integration_class(module_name), None
+        except Exception as e:
+            return None, e
+    
+    # Look for integration modules, importing them concurrently
+    index = load_integration_index(integrations_dir)
+    module_names = []
+    for file in _integration_module_files(integrations_dir):
+        module_name = file[:-3]
+        info = index.get(module_name)
+        if info is None or info['class_name'] or info.get('error'):
+            module_names.append(module_name)
+        else:
+            logging.getLogger("IntegrationDiscovery").debug(
+                f"Skipping {module_name}: it defines no {' / '.join(_integration_class_names(module_name))} class")
+    for module_name, (integration_class, error) in zip(module_names, _map_modules(resolve, module_names)):
+        yield module_name, integration_class, error
+
+
+@lru_cache(maxsize=8)
+def _discover_integration_classes(integrations_dir: str) -> Tuple[Tuple[str, type], ...]:
+    """Scan a directory once per process for (module_name, integration_class) pairs"""
+    found = []
+    logger = logging.getLogger("IntegrationDiscovery")
+    
+    for module_name, integration_class, error in _iter_integration_modules(integrations_dir):
+        if error is not None:
+            logger.warning(f"Failed to load integration from {module_name}: {error}")
+        elif integration_class:
+            found.append((module_name, integration_class))
+        else:
+            logger.warning(f"No integration class found in {module_name}")
+    
+    return tuple(found)
+
+
+def clear_discovery_cache():
+    """Forget discovered integrations and loaded indexes so the next discovery starts over"""
+    _discover_integration_classes.cache_clear()
+    _integration_classes.clear()
+    _loaded_indexes.clear()
+
+
+def auto_discover_integrations(integrations_dir: str = None, exclude: Iterable[str] = ()) -> List[Integration]:
+    """
+    Auto-discover integrations in the integrations directory
+    
+    The directory scan is cached per process (see clear_discovery_cache); every
+    call still returns fresh instances so callers can adjust their settings.
+    Integrations named in exclude are never constructed.
+    """
+    exclude = frozenset(exclude)
     if integrations_dir is None:
         integrations_dir = os.path.dirname(__file__)
     
     discovered = []
     logger = logging.getLogger("IntegrationDiscovery")
     
-    # Look for integration modules
-    for file in os.listdir(integrations_dir):
-        if file.endswith('.py') and not file.startswith('_') and file != '__init__.py':
-            module_name = file[:-3]  # Remove .py extension
-            
-            try:
-                # Import the module
-                module = importlib.import_module(f'integrations.{module_name}')
-                
-                # Look for integration classes - try multiple naming patterns
-                integration_class = None
-                possible_names = [
-                    f"{module_name.title()}Integration",
-                    f"{module_name.capitalize()}Integration", 
-                    f"{module_name.upper()}Integration",
-                    f"{module_name}Integration"
-                ]
-                
-                for class_name in possible_names:
-                    if hasattr(module, class_name):
-                        attr = getattr(module, class_name)
-                        if (isinstance(attr, type) and 
-                            issubclass(attr, Integration) and 
-                            attr != Integration):
-                            integration_class = attr
-                            break
-                
-                if integration_class:
-                    # Create default config
-                    config = IntegrationConfig(name=module_name)
-                    integration = integration_class(config)
-                    discovered.append(integration)
-                    logger.info(f"Discovered integration: {module_name}")
-                else:
-                    logger.warning(f"No integration class found in {module_name}")
-                        
-            except Exception as e:
-                logger.warning(f"Failed to load integration from {module_name}: {e}")
+    for module_name, integration_class in _discover_integration_classes(os.path.abspath(integrations_dir)):
+        if module_name in exclude:
+            continue
+        try:
+            # Create default config
+            config = IntegrationConfig(name=module_name)
+            integration = integration_class(config)
+            discovered.append(integration)
+            logger.info(f"Discovered integration: {module_name}")
+        except Exception as e:
+            logger.warning(f"Failed to load integration from {module_name}: {e}")
     
     return discovered
 
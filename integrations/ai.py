@@ -1,12 +1,86 @@
+import time
 import logging
-from typing import Dict, List, Callable
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Dict, List, Callable
 from integrations import Integration, IntegrationConfig
 from utils import config, get_env
 
+# Transient LLM backend errors (litellm exception names) worth re-issuing a chat for
+_RETRYABLE_ERRORS = frozenset({
+    'RateLimitError', 'APIConnectionError', 'ServiceUnavailableError',
+    'InternalServerError', 'Timeout', 'APITimeoutError'
+})
+
+# Shorthand api_base values accepted in config
+_API_BASES = {
+    'groq': "https://api.groq.com/openai/v1",
+    'openai': "https://api.openai.com/v1/models"
+}
+
+
+def _bool(value, default: bool = True, name: str = None) -> bool:
+    """Read a config flag that may be a real bool or a string such as 'true' or 'false'
+
+    Unrecognised values give default, with a warning when the setting's name is passed.
+    """
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in ('1', 'true', 'yes', 'on'):
+        return True
+    if text in ('0', 'false', 'no', 'off'):
+        return False
+    if name:
+        logging.warning("Invalid %s value %r, defaulting to %s", name, value, str(default).lower())
+    return default
+
+
+def _float(value, name: str):
+    """Read an optional numeric setting, warning and giving None when it isn't a number"""
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        logging.warning("Invalid %s value %r, ignoring it", name, value)
+        return None
+
+
+def _interpreter_options(settings: Dict[str, Any]) -> Dict[str, Any]:
+    """Parse OpenInterpreter options once, taking integration settings over the global config"""
+    def setting(key, default=None):
+        return settings.get(key, config.config.get(key, default))
+    
+    api_base = setting('openinterpreter_llm_api_base')
+    return {
+        'api_base': _API_BASES.get(api_base, api_base),
+        'verbose': _bool(setting('openinterpreter_verbose_mode_isenabled', True), True,
+                         'openinterpreter_verbose_mode_isenabled'),
+        'auto_run': _bool(setting('openinterpreter_auto_run_isenabled', False), False,
+                          'openinterpreter_auto_run_isenabled'),
+        'api_key': setting('openinterpreter_llm_api_key'),
+        'model': setting('openinterpreter_llm_model'),
+        'temperature': _float(setting('openinterpreter_llm_temperature'), 'openinterpreter_llm_temperature')
+    }
+
+
+def _configure_interpreter(interpreter, options: Dict[str, Any]):
+    """Apply options from _interpreter_options to an OpenInterpreter instance"""
+    if options['api_base']:
+        interpreter.llm.api_base = options['api_base']
+    interpreter.verbose = options['verbose']
+    interpreter.auto_run = options['auto_run']
+    interpreter.llm.api_key = options['api_key']
+    interpreter.llm.model = options['model']
+    interpreter.llm.temperature = options['temperature']
+
 
 class AiIntegration(Integration):
     """AI integration for OpenInterpreter and other AI tools"""
     
+    CAPABILITIES = ['openinterpreter', 'ai_automation']
+    
     def __init__(self, config: IntegrationConfig):
         super().__init__(config)
         
@@ -14,28 +88,38 @@ class AiIntegration(Integration):
         self.openinterpreter_enabled = self.settings.get('openinterpreter_enabled', True)
         self.ai_automation_enabled = self.settings.get('ai_automation_enabled', True)
         
+        # The flags are fixed once constructed, so the dispatch tables are too
+        self._handlers = {}
+        if self.openinterpreter_enabled:
+            self._handlers['openinterpreter'] = self._handle_openinterpreter
+        if self.ai_automation_enabled:
+            self._handlers['ai_automation'] = self._handle_ai_automation
+        self._capabilities = tuple(self._handlers)
+        
         # OpenInterpreter configuration
         self.interpreter = None
-        if self.openinterpreter_enabled:
-            self._setup_openinterpreter()
+        self.request_timeout = float(self.settings.get('openinterpreter_request_timeout', 120))
+        self.max_retries = int(self.settings.get('openinterpreter_max_retries', 2))
+        # Each chat thread beyond the first drives its own interpreter (one conversation each)
+        self.max_concurrent_chats = max(1, int(self.settings.get('max_concurrent_ai', 1)))
+        self._chat_executor = None
+        self._thread_state = threading.local()
+        self._primary_lock = threading.Lock()
+        self._primary_claimed = False
+        # Bumped by "openinterpreter --new"; each chat thread resets its conversation when behind
+        self._conversation = 0
+        self._http_client = None  # Keep-alive pool shared by litellm's completion calls
+        # Importing interpreter pulls in litellm, tiktoken etc., so by default that waits for the first task
+        self.preload = _bool(self.settings.get('openinterpreter_preload', False), False)
+        self._setup_attempted = False
     
     def get_capabilities(self) -> List[str]:
         """Return list of capabilities this integration provides"""
-        capabilities = []
-        if self.openinterpreter_enabled:
-            capabilities.append('openinterpreter')
-        if self.ai_automation_enabled:
-            capabilities.append('ai_automation')
-        return capabilities
+        return list(self._capabilities)
     
     def get_handlers(self) -> Dict[str, Callable]:
         """Return dictionary of capability -> handler function mappings"""
-        handlers = {}
-        if self.openinterpreter_enabled:
-            handlers['openinterpreter'] = self._handle_openinterpreter
-        if self.ai_automation_enabled:
-            handlers['ai_automation'] = self._handle_ai_automation
-        return handlers
+        return self._handlers
     
     def get_dependencies(self) -> List[str]:
         """Get list of Python package dependencies"""
@@ -47,57 +131,57 @@ class AiIntegration(Integration):
     def initialize(self) -> bool:
         """Initialize the integration"""
         try:
-            if self.openinterpreter_enabled and not self.interpreter:
-                self._setup_openinterpreter()
+            if self.openinterpreter_enabled and self.preload:
+                self._ensure_interpreter()
+            
+            if self._http_client and self.interpreter and self.interpreter.llm.api_base:
+                # Open the TLS session now instead of on the first user request
+                try:
+                    self._http_client.head(self.interpreter.llm.api_base, timeout=5)
+                except Exception as e:
+                    self.logger.debug("LLM endpoint warm-up failed: %s", e)
             
             self.logger.info("AI integration initialized")
             return True
         except Exception as e:
-            self.logger.error(f"Failed to initialize AI integration: {e}")
+            self.logger.error("Failed to initialize AI integration: %s", e)
             return False
     
     def cleanup(self):
         """Clean up resources"""
+        if self._chat_executor:
+            self._chat_executor.shutdown(wait=False)  # Python 3.8 has no cancel_futures
+            self._chat_executor = None
+        if self._http_client:
+            try:
+                import litellm
+                if litellm.client_session is self._http_client:
+                    litellm.client_session = None
+            except ImportError:
+                pass
+            self._http_client.close()
+            self._http_client = None
         self.logger.info("AI integration cleaned up")
     
+    def _ensure_interpreter(self):
+        """Set OpenInterpreter up on first use; returns None if it isn't available"""
+        if not self._setup_attempted:
+            with self._primary_lock:
+                if not self._setup_attempted:
+                    self._setup_openinterpreter()
+                    self._setup_attempted = True
+        return self.interpreter
+    
     def _setup_openinterpreter(self):
         """Setup OpenInterpreter with configuration"""
         try:
             from interpreter import interpreter
             self.interpreter = interpreter
             
-            # Configure API base
-            api_base = self.settings.get('openinterpreter_llm_api_base', 
-                                       config.config.get("openinterpreter_llm_api_base"))
+            self._interpreter_options = _interpreter_options(self.settings)
+            _configure_interpreter(self.interpreter, self._interpreter_options)
             
-            if api_base in ["groq", "openai"]:
-                if api_base == "groq":
-                    self.interpreter.llm.api_base = "https://api.groq.com/openai/v1"
-                elif api_base == "openai":
-                    self.interpreter.llm.api_base = "https://api.openai.com/v1/models"
-            elif api_base:
-                self.interpreter.llm.api_base = api_base
-            
-            # Configure verbose mode
-            verbose_mode = self.settings.get('openinterpreter_verbose_mode_isenabled',
-                                           config.config.get("openinterpreter_verbose_mode_isenabled", "true"))
-            if verbose_mode == "true":
-                self.interpreter.verbose = True
-            elif verbose_mode == "false":
-                self.interpreter.verbose = False
-            else:
-                self.logger.warning("Invalid verbose mode setting, defaulting to true")
-                self.interpreter.verbose = True
-            
-            # Set other configuration
-            self.interpreter.auto_run = self.settings.get('openinterpreter_auto_run_isenabled',
-                                                        config.config.get("openinterpreter_auto_run_isenabled", False))
-            self.interpreter.llm.api_key = self.settings.get('openinterpreter_llm_api_key',
-                                                           config.config.get("openinterpreter_llm_api_key"))
-            self.interpreter.llm.model = self.settings.get('openinterpreter_llm_model',
-                                                         config.config.get("openinterpreter_llm_model"))
-            self.interpreter.llm.temperature = self.settings.get('openinterpreter_llm_temperature',
-                                                               config.config.get("openinterpreter_llm_temperature"))
+            self._setup_http_client()
             
             self.logger.info("OpenInterpreter configured successfully")
             
@@ -105,98 +189,178 @@ class AiIntegration(Integration):
             self.logger.error("OpenInterpreter not installed. Install with: pip install open-interpreter")
             self.interpreter = None
         except Exception as e:
-            self.logger.error(f"Failed to setup OpenInterpreter: {e}")
+            self.logger.error("Failed to setup OpenInterpreter: %s", e)
             self.interpreter = None
     
+    def _setup_http_client(self):
+        """Give litellm (OpenInterpreter's LLM client) a pooled keep-alive httpx client"""
+        try:
+            import httpx
+            import litellm
+        except ImportError:
+            return  # litellm falls back to its own per-call clients
+        
+        if litellm.client_session is not None:
+            return  # Something else in this process already configured one
+        
+        self._http_client = httpx.Client(
+            limits=httpx.Limits(max_keepalive_connections=16, max_connections=32, keepalive_expiry=60),
+            timeout=httpx.Timeout(60.0, connect=10.0)
+        )
+        litellm.client_session = self._http_client
+    
+    def _thread_interpreter(self):
+        """The interpreter for the calling chat thread, cloned from the configured one on first use"""
+        interpreter = getattr(self._thread_state, 'interpreter', None)
+        if interpreter is None:
+            with self._primary_lock:
+                claim_primary = not self._primary_claimed
+                self._primary_claimed = True
+            if claim_primary:
+                interpreter = self.interpreter
+            else:
+                from interpreter import OpenInterpreter
+                interpreter = OpenInterpreter()
+                _configure_interpreter(interpreter, self._interpreter_options)
+            self._thread_state.interpreter = interpreter
+        return interpreter
+    
+    def _chat_in_thread(self, ai_task: str, conversation: int, received: threading.Event) -> List[str]:
+        """
+        Executor entry point: chat on this thread's own interpreter
+        
+        Streams the reply without terminal rendering and keeps only the text of each
+        message, code block and console output instead of every chunk dict. received
+        is set on the first chunk; a call that fails before then leaves the conversation
+        as it found it, so it is safe to send again.
+        """
+        interpreter = self._thread_interpreter()
+        if getattr(self._thread_state, 'conversation', 0) != conversation:
+            interpreter.reset()
+            self._thread_state.conversation = conversation
+        
+        parts = []  # One list of content pieces per message
+        started = time.monotonic()
+        history_length = len(interpreter.messages)
+        try:
+            for chunk in interpreter.chat(ai_task, display=False, stream=True):
+                received.set()
+                self._collect_chunk(chunk, parts, started)
+        except Exception:
+            if not received.is_set():
+                del interpreter.messages[history_length:]  # Drop the unanswered user message
+            raise
+        return [text for text in map(''.join, parts) if text]
+    
+    def _collect_chunk(self, chunk, parts: List[List[str]], started: float):
+        """Add one streamed chunk's text to parts, starting a new entry per message"""
+        if type(chunk) is not dict:  # Chunks are plain dicts; skip the isinstance MRO walk
+            parts.append([str(chunk)])
+            return
+        if chunk.get('type') == 'confirmation' or chunk.get('format') == 'active_line':
+            return
+        if chunk.get('start') or not parts:
+            if not parts and self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("First OpenInterpreter chunk after %.2fs", time.monotonic() - started)
+            parts.append([])
+        content = chunk.get('content')
+        if content is not None:
+            parts[-1].append(str(content))
+    
+    def _chat(self, ai_task: str):
+        """Run interpreter.chat with a timeout, retrying transient backend errors with backoff
+
+        Only calls that failed before producing any output are retried.
+        """
+        if self._chat_executor is None:
+            with self._primary_lock:
+                if self._chat_executor is None:
+                    self._chat_executor = ThreadPoolExecutor(max_workers=self.max_concurrent_chats,
+                                                             thread_name_prefix='openinterpreter')
+        
+        for attempt in range(self.max_retries + 1):
+            received = threading.Event()
+            future = self._chat_executor.submit(self._chat_in_thread, ai_task, self._conversation, received)
+            try:
+                return future.result(timeout=self.request_timeout)
+            except FutureTimeoutError:
+                # The call can't be interrupted and will keep adding to its conversation,
+                # so the next task starts a fresh one (it queues behind this call)
+                self._conversation += 1
+                raise TimeoutError(f"no response within {self.request_timeout:g}s")
+            except Exception as e:
+                # Once output has streamed, code may already have run; sending the task again could repeat it
+                if (type(e).__name__ not in _RETRYABLE_ERRORS or received.is_set()
+                        or attempt == self.max_retries):
+                    raise
+                delay = 2 ** attempt
+                self.logger.warning("OpenInterpreter call failed (%s), retrying in %ds", e, delay)
+                time.sleep(delay)
+    
     def _handle_openinterpreter(self, task: str) -> str:
         """Handle OpenInterpreter tasks"""
         try:
-            if not self.interpreter:
+            if not self._ensure_interpreter():
                 return "OpenInterpreter not available. Please check configuration and dependencies."
             
             # Extract the actual task from the command
-            parts = task.split(maxsplit=1)
-            if len(parts) < 2:
-                return "Invalid OpenInterpreter task format. Usage: openinterpreter <task>"
-            
-            ai_task = parts[1]
+            ai_task = task.partition(' ')[2].strip()
+            if ai_task == '--new' or ai_task.startswith('--new '):
+                # The interpreter keeps its conversation between tasks unless asked to start over
+                self._conversation += 1
+                ai_task = ai_task[len('--new'):].strip()
+                if not ai_task:
+                    return "OpenInterpreter conversation reset"
+            if not ai_task:
+                return "Invalid OpenInterpreter task format. Usage: openinterpreter [--new] <task>"
             
             # Execute the task
-            self.logger.info(f"Executing OpenInterpreter task: {ai_task}")
-            result = self.interpreter.chat(ai_task)
-            
-            # Format the result
-            if isinstance(result, list):
-                # Extract text responses from the result
-                response_parts = []
-                for item in result:
-                    if isinstance(item, dict) and 'content' in item:
-                        response_parts.append(str(item['content']))
-                    else:
-                        response_parts.append(str(item))
-                response = "\n".join(response_parts)
-            else:
-                response = str(result)
+            self.logger.info("Executing OpenInterpreter task: %s", ai_task)
+            response = "\n".join(self._chat(ai_task))
             
             self.logger.info("OpenInterpreter task completed")
             return f"OpenInterpreter result: {response}"
             
         except Exception as e:
-            self.logger.error(f"OpenInterpreter task error: {e}")
+            self.logger.error("OpenInterpreter task error: %s", e)
             return f"OpenInterpreter task failed: {str(e)}"
     
     def _handle_ai_automation(self, task: str) -> str:
         """Handle general AI automation tasks"""
         try:
-            parts = task.split(maxsplit=1)
-            if len(parts) < 2:
+            automation_task = task.partition(' ')[2].strip()
+            if not automation_task:
                 return "Invalid AI automation task format. Usage: ai_automation <task>"
             
-            automation_task = parts[1]
-            
             # For now, delegate to OpenInterpreter if available
-            if self.interpreter:
+            if self.openinterpreter_enabled and self._ensure_interpreter():
                 return self._handle_openinterpreter(f"openinterpreter {automation_task}")
             else:
                 # Could integrate with other AI services here
                 return "AI automation not available. OpenInterpreter not configured."
             
         except Exception as e:
-            self.logger.error(f"AI automation task error: {e}")
+            self.logger.error("AI automation task error: %s", e)
             return f"AI automation task failed: {str(e)}"
 
 
 # Legacy function wrapper for backward compatibility
+_legacy_configured = False
+
+
 def openinterpretercall(task):
     """Legacy OpenInterpreter function"""
+    global _legacy_configured
     try:
         from interpreter import interpreter
         
-        # Configure interpreter (basic setup)
-        if config.config.get("openinterpreter_llm_api_base") in ["groq", "openai"]:
-            if config.config.get("openinterpreter_llm_api_base") == "groq":
-                interpreter.llm.api_base = "https://api.groq.com/openai/v1"
-            elif config.config.get("openinterpreter_llm_api_base") == "openai":
-                interpreter.llm.api_base = "https://api.openai.com/v1/models"
-        else:
-            interpreter.llm.api_base = config.config.get("openinterpreter_llm_api_base")
-
-        if config.config.get("openinterpreter_verbose_mode_isenabled") == "true":
-            interpreter.verbose = True
-        elif config.config.get("openinterpreter_verbose_mode_isenabled") == "false":
-            interpreter.verbose = False
-        else:
-            logging.error("Invalid value for openinterpreter_verbose_mode_isenabled in config. Defaulting to true")
-            interpreter.verbose = True
-
-        # Set the rest of the OI values
-        interpreter.auto_run = config.config.get("openinterpreter_auto_run_isenabled")
-        interpreter.llm.api_key = config.config.get("openinterpreter_llm_api_key")
-        interpreter.llm.model = config.config.get("openinterpreter_llm_model")
-        interpreter.llm.temperature = config.config.get("openinterpreter_llm_temperature")
+        # The interpreter is a process-wide singleton, so configuring it once is enough
+        if not _legacy_configured:
+            _configure_interpreter(interpreter, _interpreter_options({}))
+            _legacy_configured = True
 
         # Run openinterpreter based on task from llm_parse.py
         interpreter.chat(task)
         
     except Exception as e:
-        logging.error(f"OpenInterpreter error: {e}")
+        logging.error("OpenInterpreter error: %s", e)
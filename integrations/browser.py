@@ -1,11 +1,67 @@
+import os
+import re
+import shutil
 import logging
 import urllib.parse
-import webbrowser
 import subprocess
 import platform
-from typing import Dict, List, Callable
+import threading
+from functools import lru_cache, partial
+from typing import Dict, List, Callable, Optional
 from integrations import Integration, IntegrationConfig
 
+# The OS doesn't change while we run, so the way URLs get opened is picked once below
+_SYSTEM = platform.system()
+
+
+# Voice commands repeat, so encoded queries are worth remembering
+_enc = lru_cache(maxsize=1024)(urllib.parse.quote_plus)
+_enc_fragment = lru_cache(maxsize=1024)(urllib.parse.quote)  # For queries in a URL fragment
+
+
+def _payload(task: str) -> Optional[str]:
+    """Return the text after "<integration> <action>" in a task, or None if there is none"""
+    _, _, rest = task.strip().partition(' ')
+    _, _, payload = rest.lstrip().partition(' ')
+    return payload.strip() or None
+
+
+# http(s) URL with a plain host, optional port and no whitespace; anything else is refused
+_URL_RE = re.compile(r'^https?://[\w.\-]+(?::\d+)?(?:[/?#]\S*)?$', re.ASCII)
+
+
+def _normalize_url(url: str) -> Optional[str]:
+    """Return url with a scheme added if it had none, or None if it isn't a web URL"""
+    if '://' not in url:
+        url = 'https://' + url
+    return url if _URL_RE.match(url) else None
+
+
+def _launch(command: List[str]):
+    """Start a detached process without waiting for it"""
+    subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                     close_fds=True, start_new_session=True)
+
+
+if _SYSTEM == 'Darwin':
+    def _open_in_browser(url: str):
+        """Start opening a URL in Safari and return without waiting for it"""
+        _launch(['open', '-a', 'Safari', url])
+elif _SYSTEM == 'Windows':
+    def _open_in_browser(url: str):
+        """Hand a URL to the default browser; ShellExecute returns immediately"""
+        os.startfile(url)
+elif shutil.which('xdg-open'):
+    def _open_in_browser(url: str):
+        """Start opening a URL in the desktop's default browser and return without waiting"""
+        _launch(['xdg-open', url])
+else:
+    def _open_in_browser(url: str):
+        """Start opening a URL and return without waiting for the browser"""
+        import webbrowser  # Only needed on this fallback path
+        # webbrowser.open can block until the browser process returns on some platforms
+        threading.Thread(target=webbrowser.open, args=(url,), daemon=True).start()
+
 # Integration Metadata
 INTEGRATION_METADATA = {
     "name": "browser",
@@ -87,6 +143,15 @@ FEATURE_CONFIGS = {
 class BrowserIntegration(Integration):
     """Browser automation integration"""
     
+    # capability -> (service label, usage keyword, URL template, query encoder)
+    # Gmail's query lives in the URL fragment, where '+' would not read as a space
+    _SEARCH_URLS = {
+        'browsergoogle': ("Google", "google", "https://www.google.com/search?q={}", _enc),
+        'browseryoutube': ("YouTube", "youtube", "https://www.youtube.com/results?search_query={}", _enc),
+        'browsergmail': ("Gmail", "gmail", "https://mail.google.com/mail/u/0/#search/{}", _enc_fragment),
+        'browseramazon': ("Amazon", "amazon", "https://www.amazon.com/s?k={}", _enc),
+    }
+    
     def __init__(self, config: IntegrationConfig):
         super().__init__(config)
         
@@ -96,36 +161,26 @@ class BrowserIntegration(Integration):
         self.youtube_enabled = self.settings.get('youtube_enabled', True)
         self.gmail_enabled = self.settings.get('gmail_enabled', True)
         self.amazon_enabled = self.settings.get('amazon_enabled', True)
+        
+        # The flags are fixed once constructed, so the dispatch tables are too
+        self._handlers = {}
+        if self.site_enabled:
+            self._handlers['browsersite'] = self._handle_site
+        for capability, enabled in (('browsergoogle', self.google_enabled),
+                                    ('browseryoutube', self.youtube_enabled),
+                                    ('browsergmail', self.gmail_enabled),
+                                    ('browseramazon', self.amazon_enabled)):
+            if enabled:
+                self._handlers[capability] = partial(self._handle_search, capability)
+        self._capabilities = tuple(self._handlers)
     
     def get_capabilities(self) -> List[str]:
         """Return list of capabilities this integration provides"""
-        capabilities = []
-        if self.site_enabled:
-            capabilities.append('browsersite')
-        if self.google_enabled:
-            capabilities.append('browsergoogle')
-        if self.youtube_enabled:
-            capabilities.append('browseryoutube')
-        if self.gmail_enabled:
-            capabilities.append('browsergmail')
-        if self.amazon_enabled:
-            capabilities.append('browseramazon')
-        return capabilities
+        return list(self._capabilities)
     
     def get_handlers(self) -> Dict[str, Callable]:
         """Return dictionary of capability -> handler function mappings"""
-        handlers = {}
-        if self.site_enabled:
-            handlers['browsersite'] = self._handle_site
-        if self.google_enabled:
-            handlers['browsergoogle'] = self._handle_google
-        if self.youtube_enabled:
-            handlers['browseryoutube'] = self._handle_youtube
-        if self.gmail_enabled:
-            handlers['browsergmail'] = self._handle_gmail
-        if self.amazon_enabled:
-            handlers['browseramazon'] = self._handle_amazon
-        return handlers
+        return self._handlers
     
     def initialize(self) -> bool:
         """Initialize the integration"""
@@ -136,137 +191,70 @@ class BrowserIntegration(Integration):
         """Clean up resources"""
         self.logger.info("Browser integration cleaned up")
     
-    def _open_url(self, url: str, description: str = ""):
-        """Helper method to open URLs across platforms"""
+    def _open_url(self, url: str):
+        """Helper method to open URLs across platforms; callers log what was opened"""
         try:
-            if platform.system() == 'Darwin':  # macOS
-                subprocess.run(['open', '-a', 'Safari', url])
-            else:  # Windows or other OS
-                webbrowser.open(url)
-            self.logger.info(f"Opened {description or url}")
+            _open_in_browser(url)
         except Exception as e:
-            self.logger.error(f"Failed to open {description or url}: {e}")
+            self.logger.error("Failed to open %s: %s", url, e)
             raise
     
     def _handle_site(self, task: str) -> str:
         """Handle opening websites directly"""
-        parts = task.split()
-        if len(parts) < 3:
+        target = _payload(task)
+        if not target:
             return "Invalid site command format. Usage: browser site <url>"
         
-        url = " ".join(parts[2:])
-        self._open_url(url, f"website: {url}")
-        return f"Opened website: {url}"
-    
-    def _handle_google(self, task: str) -> str:
-        """Handle Google searches"""
-        parts = task.split()
-        if len(parts) < 3:
-            return "Invalid Google search format. Usage: browser google <search terms>"
-        
-        query = " ".join(parts[2:])
-        encoded_query = urllib.parse.quote(query)
-        url = f"https://www.google.com/search?q={encoded_query}"
-        self._open_url(url, f"Google search for: {query}")
-        return f"Searched Google for: {query}"
-    
-    def _handle_youtube(self, task: str) -> str:
-        """Handle YouTube searches"""
-        parts = task.split()
-        if len(parts) < 3:
-            return "Invalid YouTube search format. Usage: browser youtube <search terms>"
-        
-        query = " ".join(parts[2:])
-        encoded_query = urllib.parse.quote(query)
-        url = f"https://www.youtube.com/results?search_query={encoded_query}"
-        self._open_url(url, f"YouTube search for: {query}")
-        return f"Searched YouTube for: {query}"
-    
-    def _handle_gmail(self, task: str) -> str:
-        """Handle Gmail searches"""
-        parts = task.split()
-        if len(parts) < 3:
-            return "Invalid Gmail search format. Usage: browser gmail <search terms>"
+        url = _normalize_url(target)
+        if url is None:
+            return f"Invalid URL: {target}"
         
-        query = " ".join(parts[2:])
-        encoded_query = urllib.parse.quote(query)
-        url = f"https://mail.google.com/mail/u/0/#search/{encoded_query}"
-        self._open_url(url, f"Gmail search for: {query}")
-        return f"Searched Gmail for: {query}"
+        self._open_url(url)
+        self.logger.info("Opened website: %s", url)
+        return f"Opened website: {url}"
     
-    def _handle_amazon(self, task: str) -> str:
-        """Handle Amazon searches"""
-        parts = task.split()
-        if len(parts) < 3:
-            return "Invalid Amazon search format. Usage: browser amazon <search terms>"
+    def _handle_search(self, capability: str, task: str) -> str:
+        """Handle Google, YouTube, Gmail and Amazon searches"""
+        label, keyword, url_template, encode = self._SEARCH_URLS[capability]
+        query = _payload(task)
+        if not query:
+            return f"Invalid {label} search format. Usage: browser {keyword} <search terms>"
         
-        query = " ".join(parts[2:])
-        encoded_query = urllib.parse.quote(query)
-        url = f"https://www.amazon.com/s?k={encoded_query}"
-        self._open_url(url, f"Amazon search for: {query}")
-        return f"Searched Amazon for: {query}"
+        url = url_template.format(encode(query))
+        self._open_url(url)
+        self.logger.info("Opened %s search for: %s", label, query)
+        return f"Searched {label} for: {query}"
 
 
 # Legacy function wrappers for backward compatibility
 def BrowserSite(title):
     """Legacy wrapper for browser site functionality"""
+    url = _normalize_url(title)
+    if url is None:
+        logging.error("Refusing to open invalid URL: %s", title)
+        return
     try:
-        if platform.system() == 'Darwin':  # macOS
-            subprocess.run(['open', '-a', 'Safari', title])
-        else:  # Windows or other OS
-            webbrowser.open(title)
-        logging.info(f"Opened website: {title}")
-    except Exception as e:
-        logging.error(f"Failed to open website: {e}")
-
-def BrowserGoogle(title):
-    """Legacy wrapper for browser google functionality"""
-    encoded_query = urllib.parse.quote(title)
-    url = f"https://www.google.com/search?q={encoded_query}"
-    try:
-        if platform.system() == 'Darwin':  # macOS
-            subprocess.run(['open', '-a', 'Safari', url])
-        else:  # Windows or other OS
-            webbrowser.open(url)
-        logging.info(f"Opened Google search for query: {title}")
-    except Exception as e:
-        logging.error(f"Failed to open Google search: {e}")
-
-def BrowserYoutube(title):
-    """Legacy wrapper for browser youtube functionality"""
-    encoded_query = urllib.parse.quote(title)
-    url = f"https://www.youtube.com/results?search_query={encoded_query}"
-    try:
-        if platform.system() == 'Darwin':  # macOS
-            subprocess.run(['open', '-a', 'Safari', url])
-        else:  # Windows or other OS
-            webbrowser.open(url)
-        logging.info(f"Opened YouTube search for query: {title}")
+        _open_in_browser(url)
+        logging.info("Opened website: %s", title)
     except Exception as e:
-        logging.error(f"Failed to open YouTube search: {e}")
+        logging.error("Failed to open website: %s", e)
 
-def BrowserGmail(title):
-    """Legacy wrapper for browser gmail functionality"""
-    encoded_query = urllib.parse.quote(title)
-    url = f"https://mail.google.com/mail/u/0/#search/{encoded_query}"
-    try:
-        if platform.system() == 'Darwin':  # macOS
-            subprocess.run(['open', '-a', 'Safari', url])
-        else:  # Windows or other OS
-            webbrowser.open(url)
-        logging.info(f"Opened Gmail search for query: {title}")
-    except Exception as e:
-        logging.error(f"Failed to open Gmail search: {e}")
+def _legacy_search(capability: str) -> Callable[[str], None]:
+    """Build a legacy Browser<Service>(title) wrapper from the integration's search table"""
+    label, keyword, url_template, encode = BrowserIntegration._SEARCH_URLS[capability]
+    
+    def search(title):
+        try:
+            _open_in_browser(url_template.format(encode(title)))
+            logging.info("Opened %s search for query: %s", label, title)
+        except Exception as e:
+            logging.error("Failed to open %s search: %s", label, e)
+    
+    search.__name__ = search.__qualname__ = f"Browser{keyword.capitalize()}"
+    search.__doc__ = f"Legacy wrapper for browser {keyword} functionality"
+    return search
 
-def BrowserAmazon(title):
-    """Legacy wrapper for browser amazon functionality"""
-    encoded_query = urllib.parse.quote(title)
-    url = f"https://www.amazon.com/s?k={encoded_query}"
-    try:
-        if platform.system() == 'Darwin':  # macOS
-            subprocess.run(['open', '-a', 'Safari', url])
-        else:  # Windows or other OS
-            webbrowser.open(url)
-        logging.info(f"Opened Amazon search for query: {title}")
-    except Exception as e:
-        logging.error(f"Failed to open Amazon search: {e}")
+BrowserGoogle = _legacy_search('browsergoogle')
+BrowserYoutube = _legacy_search('browseryoutube')
+BrowserGmail = _legacy_search('browsergmail')
+BrowserAmazon = _legacy_search('browseramazon')
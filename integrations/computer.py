@@ -4,11 +4,147 @@ import ctypes
 import logging
 import subprocess
 import platform
-from typing import Dict, List, Callable
+import threading
+from typing import Dict, List, Callable, Tuple
 from utils.helpers import log_disabled_integration
 from utils.config import config
 from integrations import Integration, IntegrationConfig
 
+try:
+    from ctypes import POINTER, cast
+    from comtypes import CLSCTX_ALL, CoInitialize
+    from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume
+except (ImportError, OSError):  # Optional, Windows only: falls back to volume key presses
+    AudioUtilities = None
+
+# Each Windows volume key press moves the master volume by 2%
+_VOLUME_KEY_STEP = 0.02
+
+# Windows virtual keys and SendInput constants
+VK_LWIN, VK_RETURN, VK_X, VK_U = 0x5B, 0x0D, 0x58, 0x55
+VK_VOLUME_MUTE, VK_VOLUME_DOWN, VK_VOLUME_UP = 0xAD, 0xAE, 0xAF
+INPUT_KEYBOARD = 1
+KEYEVENTF_KEYUP = 0x0002
+
+
+class _KEYBDINPUT(ctypes.Structure):
+    _fields_ = [('wVk', ctypes.c_ushort), ('wScan', ctypes.c_ushort), ('dwFlags', ctypes.c_ulong),
+                ('time', ctypes.c_ulong), ('dwExtraInfo', ctypes.c_size_t)]
+
+
+class _MOUSEINPUT(ctypes.Structure):
+    _fields_ = [('dx', ctypes.c_long), ('dy', ctypes.c_long), ('mouseData', ctypes.c_ulong),
+                ('dwFlags', ctypes.c_ulong), ('time', ctypes.c_ulong), ('dwExtraInfo', ctypes.c_size_t)]
+
+
+class _HARDWAREINPUT(ctypes.Structure):
+    _fields_ = [('uMsg', ctypes.c_ulong), ('wParamL', ctypes.c_ushort), ('wParamH', ctypes.c_ushort)]
+
+
+class _INPUTUNION(ctypes.Union):
+    # MOUSEINPUT is the largest member and sets the size SendInput expects
+    _fields_ = [('ki', _KEYBDINPUT), ('mi', _MOUSEINPUT), ('hi', _HARDWAREINPUT)]
+
+
+class _INPUT(ctypes.Structure):
+    _anonymous_ = ('u',)
+    _fields_ = [('type', ctypes.c_ulong), ('u', _INPUTUNION)]
+
+
+if platform.system() == "Windows":
+    # Private handle so these prototypes don't clash with other users of ctypes.windll.user32
+    _user32 = ctypes.WinDLL('user32', use_last_error=True)
+    _SendInput = _user32.SendInput
+    _SendInput.argtypes = [ctypes.c_uint, ctypes.POINTER(_INPUT), ctypes.c_int]
+    _SendInput.restype = ctypes.c_uint
+    _VkKeyScanW = _user32.VkKeyScanW
+    _VkKeyScanW.argtypes = [ctypes.c_wchar]
+    _VkKeyScanW.restype = ctypes.c_short
+    _LockWorkStation = _user32.LockWorkStation
+    _LockWorkStation.argtypes = []
+    _LockWorkStation.restype = ctypes.c_int
+
+
+def _send_key_presses(*key_codes: int, hold: Tuple[int, ...] = ()):
+    """Press and release each virtual key in order (while holding any `hold` keys) in one SendInput call"""
+    events = [(vk, 0) for vk in hold]
+    for vk in key_codes:
+        events.append((vk, 0))
+        events.append((vk, KEYEVENTF_KEYUP))
+    events.extend((vk, KEYEVENTF_KEYUP) for vk in reversed(hold))
+    
+    inputs = (_INPUT * len(events))()
+    for entry, (vk, flags) in zip(inputs, events):
+        entry.type = INPUT_KEYBOARD
+        entry.ki.wVk = vk
+        entry.ki.dwFlags = flags
+    if _SendInput(len(events), inputs, ctypes.sizeof(_INPUT)) != len(events):
+        raise ctypes.WinError(ctypes.get_last_error())
+
+
+def _type_text(text: str) -> List[int]:
+    """Virtual keys for typing text; the shift state VkKeyScanW reports is ignored, as before"""
+    return [_VkKeyScanW(char) & 0xFF for char in text]
+
+
+def _windows_run(command: str):
+    """Open the Start menu, search for command and launch the first result"""
+    _send_key_presses(VK_LWIN)
+    time.sleep(0.2)  # Let the Start menu open before typing into it
+    _send_key_presses(*_type_text(command))
+    time.sleep(0.2)  # Let the search results catch up before Enter picks the first one
+    _send_key_presses(VK_RETURN)
+
+
+def _windows_power_shortcut(first_key: str, second_key: str):
+    """Pick an entry of the Win+X power menu"""
+    _send_key_presses(VK_X, hold=(VK_LWIN,))
+    time.sleep(0.3)
+    _send_key_presses(ord(first_key.upper()))
+    time.sleep(0.3)
+    _send_key_presses(ord(second_key.upper()))
+
+# Strips punctuation from spoken commands before they are split into words
+_SANITIZE_RE = re.compile(r'[^\w\s]')
+
+# Action tables shared by the integration and the legacy wrappers.
+# Volume word -> (AppleScript, log message, result)
+_MAC_VOLUME_SCRIPTS = {
+    "mute": ("set volume with output muted", "Muted the volume", "Volume muted"),
+    "unmute": ("set volume without output muted", "Unmuted the volume", "Volume unmuted"),
+    "up": ("set volume output volume (output volume of (get volume settings) + 10) --100%",
+           "Increased volume", "Volume increased"),
+    "down": ("set volume output volume (output volume of (get volume settings) - 10) --100%",
+             "Decreased volume", "Volume decreased")
+}
+
+# Media action -> (AppleScript, Windows virtual key, log message, result)
+_MEDIA_ACTIONS = {
+    "next": ('tell application "System Events" to key code 124 using {command down}', 0xB0,
+             "Skipped to the next song", "Skipped to next track"),
+    "back": ('tell application "System Events" to key code 123 using {command down}', 0xB1,
+             "Skipped to the previous song", "Skipped to previous track"),
+    "play": ('tell application "System Events" to key code 49', 0xB3,
+             "Play/Pause the current song", "Toggled play/pause"),
+    "pause": ('tell application "System Events" to key code 49', 0xB3,
+              "Play/Pause the current song", "Toggled play/pause")
+}
+
+# Power action -> (AppleScript, Windows key pressed after Win+X and U (None: LockWorkStation), result)
+_POWER_ACTIONS = {
+    "lock": ('tell application "System Events" to keystroke "q" using {control down, command down}', None,
+             "Computer locked"),
+    "sleep": ('tell application "System Events" to sleep', "s", "Computer put to sleep"),
+    "restart": ('tell application "System Events" to restart', "r", "Computer restarting"),
+    "shutdown": ('tell application "System Events" to shut down', "u", "Computer shutting down")
+}
+_POWER_LOG = {
+    "lock": "Locking {}...",
+    "sleep": "Putting {} to sleep...",
+    "restart": "Restarting {}...",
+    "shutdown": "Shutting down {}..."
+}
+
 
 class ComputerIntegration(Integration):
     """Computer control integration for system operations"""
@@ -29,6 +165,9 @@ class ComputerIntegration(Integration):
         # Volume settings from config
         self.vol_up_step = self.settings.get('vol_up_step_value', 5)
         self.vol_down_step = self.settings.get('vol_down_step_value', 5)
+        
+        # COM interface pointers belong to the thread that created them, so the endpoint is per thread
+        self._com_state = threading.local()
     
     def get_capabilities(self) -> List[str]:
         """Return list of capabilities this integration provides"""
@@ -67,7 +206,7 @@ class ComputerIntegration(Integration):
     
     def _handle_volume(self, task: str) -> str:
         """Handle volume control commands"""
-        title_cleaned = re.sub(r'[^\w\s]', '', task).lower()
+        title_cleaned = _SANITIZE_RE.sub('', task).lower()
         words = title_cleaned.split()
         if len(words) < 3:
             return "Invalid volume command format. Usage: computer volume <mute|unmute|up|down|0-100>"
@@ -84,22 +223,12 @@ class ComputerIntegration(Integration):
     def _handle_volume_mac(self, volume_word: str) -> str:
         """Handle volume control on macOS"""
         try:
-            if volume_word == "mute":
-                subprocess.run(["osascript", "-e", "set volume with output muted"])
-                self.logger.info("Muted the volume")
-                return "Volume muted"
-            elif volume_word == "unmute":
-                subprocess.run(["osascript", "-e", "set volume without output muted"])
-                self.logger.info("Unmuted the volume")
-                return "Volume unmuted"
-            elif volume_word == "up":
-                subprocess.run(["osascript", "-e", "set volume output volume (output volume of (get volume settings) + 10) --100%"])
-                self.logger.info("Increased volume")
-                return "Volume increased"
-            elif volume_word == "down":
-                subprocess.run(["osascript", "-e", "set volume output volume (output volume of (get volume settings) - 10) --100%"])
-                self.logger.info("Decreased volume")
-                return "Volume decreased"
+            entry = _MAC_VOLUME_SCRIPTS.get(volume_word)
+            if entry:
+                script, log_message, result = entry
+                subprocess.run(["osascript", "-e", script])
+                self.logger.info(log_message)
+                return result
             else:
                 volume_value = int(volume_word)
                 if volume_value < 0 or volume_value > 100:
@@ -116,27 +245,45 @@ class ComputerIntegration(Integration):
             self.logger.error(error_msg)
             return error_msg
     
+    def _volume_endpoint(self):
+        """The default speakers' IAudioEndpointVolume for this thread, or None without pycaw"""
+        if AudioUtilities is None:
+            return None
+        endpoint = getattr(self._com_state, 'endpoint', None)
+        if endpoint is None:
+            try:
+                CoInitialize()
+                speakers = AudioUtilities.GetSpeakers()
+                endpoint = getattr(speakers, 'EndpointVolume', None)  # pycaw >= 20240210
+                if endpoint is None:
+                    interface = speakers.Activate(IAudioEndpointVolume._iid_, CLSCTX_ALL, None)
+                    endpoint = cast(interface, POINTER(IAudioEndpointVolume))
+            except Exception as e:
+                self.logger.warning(f"Audio endpoint unavailable, using volume keys: {e}")
+                return None
+            self._com_state.endpoint = endpoint
+        return endpoint
+    
     def _handle_volume_windows(self, volume_word: str) -> str:
         """Handle volume control on Windows"""
+        endpoint = self._volume_endpoint()
+        if endpoint is not None:
+            return self._handle_volume_endpoint(endpoint, volume_word)
         try:
             if volume_word == "mute":
-                ctypes.windll.user32.keybd_event(0xAD, 0, 0, 0)
+                _send_key_presses(VK_VOLUME_MUTE)
                 self.logger.info("Muted the volume")
                 return "Volume muted"
             elif volume_word == "unmute":
-                ctypes.windll.user32.keybd_event(0xAD, 0, 0, 0)
+                _send_key_presses(VK_VOLUME_MUTE)
                 self.logger.info("Unmuted the volume")
                 return "Volume unmuted"
             elif volume_word == "up":
-                for _ in range(self.vol_up_step):
-                    ctypes.windll.user32.keybd_event(0xAF, 0, 0, 0)
-                    ctypes.windll.user32.keybd_event(0xAF, 0, 2, 0)
+                _send_key_presses(*[VK_VOLUME_UP] * self.vol_up_step)
                 self.logger.info(f"Increased volume by {self.vol_up_step} steps")
                 return f"Volume increased by {self.vol_up_step} steps"
             elif volume_word == "down":
-                for _ in range(self.vol_down_step):
-                    ctypes.windll.user32.keybd_event(0xAE, 0, 0, 0)
-                    ctypes.windll.user32.keybd_event(0xAE, 0, 2, 0)
+                _send_key_presses(*[VK_VOLUME_DOWN] * self.vol_down_step)
                 self.logger.info(f"Decreased volume by {self.vol_down_step} steps")
                 return f"Volume decreased by {self.vol_down_step} steps"
             else:
@@ -145,12 +292,37 @@ class ComputerIntegration(Integration):
                     raise ValueError("Volume must be between 0 and 100")
                 
                 # Reset volume to 0 then set to desired level
-                for _ in range(50):
-                    ctypes.windll.user32.keybd_event(0xAE, 0, 0, 0)
-                    ctypes.windll.user32.keybd_event(0xAE, 0, 2, 0)
-                for _ in range(volume_value // 2):
-                    ctypes.windll.user32.keybd_event(0xAF, 0, 0, 0)
-                    ctypes.windll.user32.keybd_event(0xAF, 0, 2, 0)
+                _send_key_presses(*[VK_VOLUME_DOWN] * 50 + [VK_VOLUME_UP] * (volume_value // 2))
+                self.logger.info(f"Set volume to {volume_value}%")
+                return f"Volume set to {volume_value}%"
+        except ValueError as e:
+            error_msg = f"Invalid volume value: {volume_word}. {str(e)}"
+            self.logger.error(error_msg)
+            return error_msg
+        except Exception as e:
+            error_msg = f"Failed to control volume: {e}"
+            self.logger.error(error_msg)
+            return error_msg
+    
+    def _handle_volume_endpoint(self, endpoint, volume_word: str) -> str:
+        """Handle volume control on Windows with single calls on the audio endpoint"""
+        try:
+            if volume_word in ("mute", "unmute"):
+                endpoint.SetMute(volume_word == "mute", None)
+                self.logger.info(f"{volume_word.capitalize()}d the volume")
+                return f"Volume {volume_word}d"
+            elif volume_word in ("up", "down"):
+                steps = self.vol_up_step if volume_word == "up" else -self.vol_down_step
+                level = endpoint.GetMasterVolumeLevelScalar() + steps * _VOLUME_KEY_STEP
+                endpoint.SetMasterVolumeLevelScalar(min(1.0, max(0.0, level)), None)
+                change = "Increased" if volume_word == "up" else "Decreased"
+                self.logger.info(f"{change} volume by {abs(steps)} steps")
+                return f"Volume {change.lower()} by {abs(steps)} steps"
+            else:
+                volume_value = int(volume_word)
+                if volume_value < 0 or volume_value > 100:
+                    raise ValueError("Volume must be between 0 and 100")
+                endpoint.SetMasterVolumeLevelScalar(volume_value / 100.0, None)
                 self.logger.info(f"Set volume to {volume_value}%")
                 return f"Volume set to {volume_value}%"
         except ValueError as e:
@@ -164,7 +336,7 @@ class ComputerIntegration(Integration):
     
     def _handle_run(self, task: str) -> str:
         """Handle application launch commands"""
-        title_cleaned = re.sub(r'[^\w\s]', '', task).lower()
+        title_cleaned = _SANITIZE_RE.sub('', task).lower()
         words = title_cleaned.split()
         if len(words) < 3:
             return "Invalid run command format. Usage: computer run <application>"
@@ -178,22 +350,7 @@ class ComputerIntegration(Integration):
                 self.logger.info(f"Executed command: {command}")
                 return f"Launched application: {command}"
             else:
-                # Press Windows key
-                ctypes.windll.user32.keybd_event(0x5B, 0, 0, 0)
-                time.sleep(0.1)
-                ctypes.windll.user32.keybd_event(0x5B, 0, 2, 0)
-                time.sleep(0.1)
-
-                # Type the command
-                for char in command:
-                    vk = ctypes.windll.user32.VkKeyScanW(ord(char))
-                    ctypes.windll.user32.keybd_event(vk, 0, 0, 0)
-                    ctypes.windll.user32.keybd_event(vk, 0, 2, 0)
-                    time.sleep(0.05)
-
-                # Press Enter
-                ctypes.windll.user32.keybd_event(0x0D, 0, 0, 0)
-                ctypes.windll.user32.keybd_event(0x0D, 0, 2, 0)
+                _windows_run(command)
                 self.logger.info(f"Executed command: {command}")
                 return f"Executed command: {command}"
         except Exception as e:
@@ -208,41 +365,18 @@ class ComputerIntegration(Integration):
             return "Invalid media command format. Usage: computer media <next|back|play|pause>"
 
         action = words[2].lower()
+        entry = _MEDIA_ACTIONS.get(action)
+        if entry is None:
+            return f"Invalid media action: {action}. Use next, back, play, or pause"
+        script, key_code, log_message, result = entry
         
         try:
             if self.is_mac:
-                if action == "next":
-                    subprocess.run(["osascript", "-e", 'tell application "System Events" to key code 124 using {command down}'])
-                    self.logger.info("Skipped to the next song")
-                    return "Skipped to next track"
-                elif action == "back":
-                    subprocess.run(["osascript", "-e", 'tell application "System Events" to key code 123 using {command down}'])
-                    self.logger.info("Skipped to the previous song")
-                    return "Skipped to previous track"
-                elif action in ["play", "pause"]:
-                    subprocess.run(["osascript", "-e", 'tell application "System Events" to key code 49'])
-                    self.logger.info("Play/Pause the current song")
-                    return "Toggled play/pause"
-                else:
-                    return f"Invalid media action: {action}. Use next, back, play, or pause"
+                subprocess.run(["osascript", "-e", script])
             else:
-                if action == "next":
-                    ctypes.windll.user32.keybd_event(0xB0, 0, 0, 0)
-                    ctypes.windll.user32.keybd_event(0xB0, 0, 2, 0)
-                    self.logger.info("Skipped to the next song")
-                    return "Skipped to next track"
-                elif action == "back":
-                    ctypes.windll.user32.keybd_event(0xB1, 0, 0, 0)
-                    ctypes.windll.user32.keybd_event(0xB1, 0, 2, 0)
-                    self.logger.info("Skipped to the previous song")
-                    return "Skipped to previous track"
-                elif action in ["play", "pause"]:
-                    ctypes.windll.user32.keybd_event(0xB3, 0, 0, 0)
-                    ctypes.windll.user32.keybd_event(0xB3, 0, 2, 0)
-                    self.logger.info("Play/Pause the current song")
-                    return "Toggled play/pause"
-                else:
-                    return f"Invalid media action: {action}. Use next, back, play, or pause"
+                _send_key_presses(key_code)
+            self.logger.info(log_message)
+            return result
         except Exception as e:
             error_msg = f"Failed to execute media command: {e}"
             self.logger.error(error_msg)
@@ -256,70 +390,26 @@ class ComputerIntegration(Integration):
         
         action = words[2].lower()
         self.logger.info(f"Power action identified: {action}")
+        entry = _POWER_ACTIONS.get(action)
+        if entry is None:
+            return f"Invalid power action: {action}. Use lock, sleep, restart, or shutdown"
+        script, menu_key, result = entry
 
         try:
             if self.is_mac:
-                if action == "lock":
-                    self.logger.info("Locking Mac...")
-                    subprocess.run(['osascript', '-e', 'tell application "System Events" to keystroke "q" using {control down, command down}'])
-                    return "Computer locked"
-                elif action == "sleep":
-                    self.logger.info("Putting Mac to sleep...")
-                    subprocess.run(['osascript', '-e', 'tell application "System Events" to sleep'])
-                    return "Computer put to sleep"
-                elif action == "restart":
-                    self.logger.info("Restarting Mac...")
-                    subprocess.run(['osascript', '-e', 'tell application "System Events" to restart'])
-                    return "Computer restarting"
-                elif action == "shutdown":
-                    self.logger.info("Shutting down Mac...")
-                    subprocess.run(['osascript', '-e', 'tell application "System Events" to shut down'])
-                    return "Computer shutting down"
-                else:
-                    return f"Invalid power action: {action}. Use lock, sleep, restart, or shutdown"
+                self.logger.info(_POWER_LOG[action].format("Mac"))
+                subprocess.run(['osascript', '-e', script])
             else:
-                if action == "lock":
-                    self.logger.info("Locking computer...")
-                    ctypes.windll.user32.LockWorkStation()
-                    return "Computer locked"
-                elif action == "sleep":
-                    self.logger.info("Putting computer to sleep...")
-                    self._windows_power_shortcut("u", "s")
-                    return "Computer put to sleep"
-                elif action == "restart":
-                    self.logger.info("Restarting computer...")
-                    self._windows_power_shortcut("u", "r")
-                    return "Computer restarting"
-                elif action == "shutdown":
-                    self.logger.info("Shutting down computer...")
-                    self._windows_power_shortcut("u", "u")
-                    return "Computer shutting down"
+                self.logger.info(_POWER_LOG[action].format("computer"))
+                if menu_key is None:
+                    _LockWorkStation()
                 else:
-                    return f"Invalid power action: {action}. Use lock, sleep, restart, or shutdown"
+                    _windows_power_shortcut("u", menu_key)
+            return result
         except Exception as e:
             error_msg = f"Failed to execute power command: {e}"
             self.logger.error(error_msg)
             return error_msg
-    
-    def _windows_power_shortcut(self, first_key: str, second_key: str):
-        """Helper method for Windows power shortcuts"""
-        # Win+X menu
-        ctypes.windll.user32.keybd_event(0x5B, 0, 0, 0)  # win key down
-        ctypes.windll.user32.keybd_event(0x58, 0, 0, 0)  # x key down
-        ctypes.windll.user32.keybd_event(0x58, 0, 2, 0)  # x key up
-        ctypes.windll.user32.keybd_event(0x5B, 0, 2, 0)  # win key up
-        time.sleep(0.3)
-        
-        # First key (u for shutdown options)
-        key_code = ord(first_key.upper())
-        ctypes.windll.user32.keybd_event(key_code, 0, 0, 0)
-        ctypes.windll.user32.keybd_event(key_code, 0, 2, 0)
-        time.sleep(0.3)
-        
-        # Second key (specific action)
-        key_code = ord(second_key.upper())
-        ctypes.windll.user32.keybd_event(key_code, 0, 0, 0)
-        ctypes.windll.user32.keybd_event(key_code, 0, 2, 0)
 
 
 # Legacy function wrappers for backward compatibility
@@ -327,7 +417,7 @@ def is_mac():
     return platform.system() == "Darwin"
 
 def ComputerVolume(title):
-    title_cleaned = re.sub(r'[^\w\s]', '', title).lower()
+    title_cleaned = _SANITIZE_RE.sub('', title).lower()
     words = title_cleaned.split()
     if len(words) < 3:
         logging.error(f"Invalid prompt format '{title_cleaned}' for Computer Volume command.")
@@ -336,18 +426,10 @@ def ComputerVolume(title):
     volume_word = words[2]
 
     if is_mac():
-        if volume_word == "mute":
-            subprocess.run(["osascript", "-e", "set volume with output muted"])
-            logging.info("Muted the volume")
-        elif volume_word == "unmute":
-            subprocess.run(["osascript", "-e", "set volume without output muted"])
-            logging.info("Unmuted the volume")
-        elif volume_word == "up":
-            subprocess.run(["osascript", "-e", "set volume output volume (output volume of (get volume settings) + 10) --100%"])
-            logging.info("Increased volume")
-        elif volume_word == "down":
-            subprocess.run(["osascript", "-e", "set volume output volume (output volume of (get volume settings) - 10) --100%"])
-            logging.info("Decreased volume")
+        entry = _MAC_VOLUME_SCRIPTS.get(volume_word)
+        if entry:
+            subprocess.run(["osascript", "-e", entry[0]])
+            logging.info(entry[1])
         else:
             try:
                 volume_value = int(volume_word)
@@ -360,7 +442,7 @@ def ComputerVolume(title):
     else:
         if volume_word == "mute":
             try:
-                ctypes.windll.user32.keybd_event(0xAD, 0, 0, 0)
+                _send_key_presses(VK_VOLUME_MUTE)
                 logging.info("Muted the volume")
             except Exception as e:
                 logging.error(f"Failed to mute volume: {e}")
@@ -368,7 +450,7 @@ def ComputerVolume(title):
 
         if volume_word == "unmute":
             try:
-                ctypes.windll.user32.keybd_event(0xAD, 0, 0, 0)
+                _send_key_presses(VK_VOLUME_MUTE)
                 logging.info("Unmuted the volume")
             except Exception as e:
                 logging.error(f"Failed to unmute volume: {e}")
@@ -376,9 +458,7 @@ def ComputerVolume(title):
 
         if volume_word == "up":
             try:
-                for _ in range(config.config.get('vol_up_step_value', 5)):
-                    ctypes.windll.user32.keybd_event(0xAF, 0, 0, 0)
-                    ctypes.windll.user32.keybd_event(0xAF, 0, 2, 0)
+                _send_key_presses(*[VK_VOLUME_UP] * config.config.get('vol_up_step_value', 5))
                 logging.info(f"Increased volume by {config.config.get('vol_up_step_value', 5)} steps")
             except Exception as e:
                 logging.error(f"Failed to increase volume: {e}")
@@ -386,9 +466,7 @@ def ComputerVolume(title):
 
         if volume_word == "down":
             try:
-                for _ in range(config.config.get('vol_down_step_value', 5)):
-                    ctypes.windll.user32.keybd_event(0xAE, 0, 0, 0)
-                    ctypes.windll.user32.keybd_event(0xAE, 0, 2, 0)
+                _send_key_presses(*[VK_VOLUME_DOWN] * config.config.get('vol_down_step_value', 5))
                 logging.info(f"Decreased volume by {config.config.get('vol_down_step_value', 5)} steps")
             except Exception as e:
                 logging.error(f"Failed to decrease volume: {e}")
@@ -403,12 +481,7 @@ def ComputerVolume(title):
             return
 
         try:
-            for _ in range(50):
-                ctypes.windll.user32.keybd_event(0xAE, 0, 0, 0)
-                ctypes.windll.user32.keybd_event(0xAE, 0, 2, 0)
-            for _ in range(volume_value // 2):
-                ctypes.windll.user32.keybd_event(0xAF, 0, 0, 0)
-                ctypes.windll.user32.keybd_event(0xAF, 0, 2, 0)
+            _send_key_presses(*[VK_VOLUME_DOWN] * 50 + [VK_VOLUME_UP] * (volume_value // 2))
             logging.info(f"Set volume to {volume_value}%")
         except Exception as e:
             logging.error(f"Failed to set volume: {e}")
@@ -416,7 +489,7 @@ def ComputerVolume(title):
 computerrun_isenabled = True
 
 def ComputerRun(title):
-    title_cleaned = re.sub(r'[^\w\s]', '', title).lower()
+    title_cleaned = _SANITIZE_RE.sub('', title).lower()
     words = title_cleaned.split()
     if len(words) < 3:
         logging.error("Invalid prompt format for Computer Run command.")
@@ -432,22 +505,7 @@ def ComputerRun(title):
             logging.error(f"Failed to execute command: {e}")
     else:
         try:
-            # Press Windows key
-            ctypes.windll.user32.keybd_event(0x5B, 0, 0, 0)
-            time.sleep(0.1)
-            ctypes.windll.user32.keybd_event(0x5B, 0, 2, 0)
-            time.sleep(0.1)
-
-            # Type the command
-            for char in command:
-                vk = ctypes.windll.user32.VkKeyScanW(ord(char))
-                ctypes.windll.user32.keybd_event(vk, 0, 0, 0)
-                ctypes.windll.user32.keybd_event(vk, 0, 2, 0)
-                time.sleep(0.05)
-
-            # Press Enter
-            ctypes.windll.user32.keybd_event(0x0D, 0, 0, 0)
-            ctypes.windll.user32.keybd_event(0x0D, 0, 2, 0)
+            _windows_run(command)
             logging.info(f"Executed command: {command}")
         except Exception as e:
             logging.error(f"Failed to execute command: {e}")
@@ -461,40 +519,20 @@ def ComputerMedia(title):
         return
 
     action = words[2]
+    entry = _MEDIA_ACTIONS.get(action)
+    if entry is None:
+        logging.error("Invalid prompt format for Computer Media command.")
+        return
+    script, key_code, log_message, _ = entry
 
-    if is_mac():
-        try:
-            if action == "next":
-                subprocess.run(["osascript", "-e", 'tell application "System Events" to key code 124 using {command down}'])
-                logging.info("Skipped to the next song")
-            elif action == "back":
-                subprocess.run(["osascript", "-e", 'tell application "System Events" to key code 123 using {command down}'])
-                logging.info("Skipped to the previous song")
-            elif action == "play" or action == "pause":
-                subprocess.run(["osascript", "-e", 'tell application "System Events" to key code 49'])
-                logging.info("Play/Pause the current song")
-            else:
-                logging.error("Invalid prompt format for Computer Media command.")
-        except Exception as e:
-            logging.error(f"Failed to execute media command: {e}")
-    else:
-        try:
-            if action == "next":
-                ctypes.windll.user32.keybd_event(0xB0, 0, 0, 0)
-                ctypes.windll.user32.keybd_event(0xB0, 0, 2, 0)  # key up event
-                logging.info("Skipped to the next song")
-            elif action == "back":
-                ctypes.windll.user32.keybd_event(0xB1, 0, 0, 0)
-                ctypes.windll.user32.keybd_event(0xB1, 0, 2, 0)  # key up event
-                logging.info("Skipped to the previous song")
-            elif action == "play" or action == "pause":
-                ctypes.windll.user32.keybd_event(0xB3, 0, 0, 0)
-                ctypes.windll.user32.keybd_event(0xB3, 0, 2, 0)  # key up event
-                logging.info("Play/Pause the current song")
-            else:
-                logging.error("Invalid prompt format for Computer Media command.")
-        except Exception as e:
-            logging.error(f"Failed to execute media command: {e}")
+    try:
+        if is_mac():
+            subprocess.run(["osascript", "-e", script])
+        else:
+            _send_key_presses(key_code)
+        logging.info(log_message)
+    except Exception as e:
+        logging.error(f"Failed to execute media command: {e}")
 
 def ComputerPower(title):
     words = title.split()
@@ -507,21 +545,10 @@ def ComputerPower(title):
 
     if is_mac():
         try:
-            if action == "lock":
-                logging.info("Locking Mac...")
-                subprocess.run(['osascript', '-e', 'tell application "System Events" to keystroke "q" using {control down, command down}'])
-
-            elif action == "sleep":
-                logging.info("Putting Mac to sleep...")
-                subprocess.run(['osascript', '-e', 'tell application "System Events" to sleep'])
-
-            elif action == "restart":
-                logging.info("Restarting Mac...")
-                subprocess.run(['osascript', '-e', 'tell application "System Events" to restart'])
-
-            elif action == "shutdown":
-                logging.info("Shutting down Mac...")
-                subprocess.run(['osascript', '-e', 'tell application "System Events" to shut down'])
+            entry = _POWER_ACTIONS.get(action)
+            if entry:
+                logging.info(_POWER_LOG[action].format("Mac"))
+                subprocess.run(['osascript', '-e', entry[0]])
             else:
                 logging.error(f"Unknown action: {action}")
         except Exception as e:
@@ -531,42 +558,11 @@ def ComputerPower(title):
         try:
             if action == "lock":
                 logging.info("Locking computer...")
-                ctypes.windll.user32.LockWorkStation()
-
-            elif action == "sleep":
-                logging.info("Putting computer to sleep...")
-                ctypes.windll.user32.keybd_event(0x5B, 0, 0, 0)  # win key down
-                ctypes.windll.user32.keybd_event(0x58, 0, 0, 0)  # x key down
-                ctypes.windll.user32.keybd_event(0x58, 0, 2, 0)  # x key up
-                ctypes.windll.user32.keybd_event(0x5B, 0, 2, 0)  # win key up
-                time.sleep(0.3)
-                ctypes.windll.user32.keybd_event(0x55, 0, 0, 0)  # u key down
-                ctypes.windll.user32.keybd_event(0x55, 0, 2, 0)  # u key up
-                time.sleep(0.3)
-                ctypes.windll.user32.keybd_event(0x53, 0, 0, 0)  # s key down
-                ctypes.windll.user32.keybd_event(0x53, 0, 2, 0)  # s key up
-
-            elif action == "restart":
-                logging.info("Restarting computer...")
-                ctypes.windll.user32.keybd_event(0x5B, 0, 0, 0)  # win key down
-                ctypes.windll.user32.keybd_event(0x58, 0, 0, 0)  # x key down
-                ctypes.windll.user32.keybd_event(0x58, 0, 2, 0)  # x key up
-                ctypes.windll.user32.keybd_event(0x5B, 0, 2, 0)  # win key up
-                ctypes.windll.user32.keybd_event(0x55, 0, 0, 0)  # u key down
-                ctypes.windll.user32.keybd_event(0x55, 0, 2, 0)  # u key up
-                ctypes.windll.user32.keybd_event(0x52, 0, 0, 0)  # r key down
-                ctypes.windll.user32.keybd_event(0x52, 0, 2, 0)  # r key up
-
-            elif action == "shutdown":
-                logging.info("Shutting down computer...")
-                ctypes.windll.user32.keybd_event(0x5B, 0, 0, 0)  # win key down
-                ctypes.windll.user32.keybd_event(0x58, 0, 0, 0)  # x key down
-                ctypes.windll.user32.keybd_event(0x58, 0, 2, 0)  # x key up
-                ctypes.windll.user32.keybd_event(0x5B, 0, 2, 0)  # win key up
-                ctypes.windll.user32.keybd_event(0x55, 0, 0, 0)  # u key down
-                ctypes.windll.user32.keybd_event(0x55, 0, 2, 0)  # u key up
-                ctypes.windll.user32.keybd_event(0x55, 0, 0, 0)  # u key down
-                ctypes.windll.user32.keybd_event(0x55, 0, 2, 0)  # u key up
+                _LockWorkStation()
+
+            elif action in _POWER_ACTIONS:
+                logging.info(_POWER_LOG[action].format("computer"))
+                _windows_power_shortcut("u", _POWER_ACTIONS[action][1])
 
             else:
                 logging.error(f"Unknown action: {action}")
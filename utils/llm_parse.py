@@ -1,10 +1,56 @@
 import os
 import re
 import logging
+import threading
+from collections import OrderedDict
 from groq import Groq
 from utils import config, get_env
 
 
+# Canonical commands (the examples shown on the R1 page and in the system prompt)
+# that map to a rigid command without asking the LLM. Patterns run against the
+# whitespace-normalized prompt so captured search terms keep their casing.
+FAST_RULES = [
+    (re.compile(r"^(?:set )?(?:the )?(?:computer )?(?:volume|sound) (?:to )?(\d{1,3})%?(?: on my computer)?\.?$", re.I),
+     lambda m: f"Computer Volume {m.group(1)}"),
+    (re.compile(r"^(?:turn )?(?:the )?volume (up|down)(?: on my computer)?\.?$", re.I),
+     lambda m: f"Computer Volume {m.group(1).lower()}"),
+    (re.compile(r"^(?:mute|unmute)(?: my computer)?\.?$", re.I),
+     lambda m: f"Computer Volume {m.group(0).split()[0].rstrip('.').lower()}"),
+    (re.compile(r"^(lock|sleep|restart|shut ?down) my computer\.?$", re.I),
+     lambda m: f"Computer power {m.group(1).lower().replace(' ', '')}"),
+    (re.compile(r"^open google and search for (.+?)\.?$", re.I),
+     lambda m: f"Browser Google {m.group(1)}"),
+    (re.compile(r"^play (.+?) on youtube\.?$", re.I),
+     lambda m: f"Browser YouTube {m.group(1)}"),
+    (re.compile(r"^open (command prompt|calculator) on my computer\.?$", re.I),
+     lambda m: f"Computer run {m.group(1)}"),
+]
+
+# Prompts asking for something random must reach the LLM every time
+_UNCACHEABLE = re.compile(r"\b(?:random|roulette)\b", re.I)
+
+# Parsed commands keyed by whitespace-normalized prompt; case is kept since payloads
+# (message text, search queries, URL paths) are case-sensitive
+PARSE_CACHE_SIZE = 4096
+_parse_cache = OrderedDict()
+_parse_cache_lock = threading.Lock()
+
+# LLM calls currently running, keyed by normalized prompt, so identical
+# concurrent prompts wait for one call instead of each hitting the API
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+class _InflightCall:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
 def get_api_configuration():
     GROQ_API_KEY = get_env.GROQ_API_KEY
     if GROQ_API_KEY:
@@ -205,6 +251,75 @@ def LLMParse(user_prompt, transcript=None, temperature=0.1, top_p=1):
         raise ValueError(f"Failed to get response from API: {e}")
 
 
+def _match_fast_rule(prompt):
+    """Return the rigid command for a canonical prompt, or None"""
+    for pattern, build in FAST_RULES:
+        match = pattern.match(prompt)
+        if match:
+            return build(match)
+    return None
+
+
+def _parse_cached(prompt):
+    """LLMParse(prompt) memoized by the whitespace-normalized prompt (failures are not cached)"""
+    with _parse_cache_lock:
+        if prompt in _parse_cache:
+            _parse_cache.move_to_end(prompt)
+            return _parse_cache[prompt]
+
+    result = LLMParse(prompt)
+    with _parse_cache_lock:
+        _parse_cache[prompt] = result
+        if len(_parse_cache) > PARSE_CACHE_SIZE:
+            _parse_cache.popitem(last=False)
+    return result
+
+
+def _parse_single_flight(prompt):
+    """_parse_cached, sharing one in-flight call between identical concurrent prompts"""
+    with _inflight_lock:
+        call = _inflight.get(prompt)
+        leader = call is None
+        if leader:
+            call = _inflight[prompt] = _InflightCall()
+
+    if not leader:
+        call.done.wait()
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    try:
+        call.result = _parse_cached(prompt)
+        return call.result
+    except Exception as e:
+        call.error = e
+        raise
+    finally:
+        with _inflight_lock:
+            del _inflight[prompt]
+        call.done.set()
+
+
+def parse_command(prompt, transcript=None):
+    """
+    Turn a prompt into a rigid command string, skipping the LLM where possible
+    
+    Canonical commands are answered by FAST_RULES and repeated prompts come from
+    an LRU cache. Prompts with a transcript or asking for random actions always
+    go to the LLM since their answer is not a function of the prompt alone.
+    """
+    stripped = ' '.join(prompt.split())
+    command = _match_fast_rule(stripped)
+    if command:
+        return command
+    
+    if transcript or _UNCACHEABLE.search(stripped):
+        return LLMParse(prompt, transcript)
+    
+    return _parse_single_flight(stripped)
+
+
 def process_prompt(prompt: str, transcript: str = None) -> dict:
     """
     Process a prompt and return structured response for the distributed server
@@ -217,8 +332,8 @@ def process_prompt(prompt: str, transcript: str = None) -> dict:
         dict: Structured response with action and parameters
     """
     try:
-        # Use the existing LLMParse function
-        result = LLMParse(prompt, transcript)
+        # Use the fast rules / cache in front of the existing LLMParse function
+        result = parse_command(prompt, transcript)
         
         # If result is 'x', it means not a command for LAMControl
         if result.strip().lower() == 'x':